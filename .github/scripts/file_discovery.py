@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+
+
+def find_marked_directories(root: str, marker: str, directory_name: str | None = None) -> set[str]:
+    """Returns directories under `root` that contain a `marker` file alongside at least one subdirectory.
+
+    If `directory_name` is given, only directories with that basename are considered matches. Directories that match
+    are not recursed into. Symlinks are never followed, so entries are classified from the cached DirEntry data
+    without any additional stat calls.
+    """
+    ret: set[str] = set()
+
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        check_marker = directory_name is None or os.path.basename(directory) == directory_name
+
+        has_marker = False
+        subdirectories: list[str] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                        if has_marker:
+                            break
+                    elif check_marker and entry.name == marker and entry.is_file(follow_symlinks=False):
+                        has_marker = True
+                        if subdirectories:
+                            break
+        except OSError:
+            continue
+
+        if not subdirectories:
+            continue
+
+        if has_marker:
+            ret.add(directory)
+            continue
+
+        pending.extend(subdirectories)
+
+    return ret
+
+
+def iter_files(root: str, suffix: str) -> Iterator[str]:
+    """Yields the paths, relative to `root`, of all files under `root` whose names end with `suffix`.
+
+    Like `glob.glob(f"**/*{suffix}", root_dir=root, recursive=True)`, hidden entries are skipped and a missing `root`
+    yields nothing.
+    """
+    prefix_length = len(os.path.join(root, ""))
+
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif name.endswith(suffix):
+                        yield entry.path[prefix_length:]
+        except OSError:
+            continue
+
+
+def find_files(roots: Sequence[str], suffix: str) -> list[list[str]]:
+    """Returns the iter_files() results for each of `roots`, crawling the roots concurrently."""
+    if not roots:
+        return []
+
+    with ThreadPoolExecutor(max_workers=len(roots)) as executor:
+        return list(executor.map(lambda root: list(iter_files(root, suffix)), roots))
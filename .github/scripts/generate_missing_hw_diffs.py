@@ -6,44 +6,17 @@ import argparse
 import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
+from file_discovery import find_marked_directories
 
-def _find_results_paths(results_dir: str) -> set[str]:
-    ret: set[str] = set()
-
-    for root, dirnames, filenames in os.walk(results_dir):
-        if not dirnames:
-            continue
-
-        if "results.json" not in filenames:
-            continue
-
-        ret.add(root)
 
-        # No need to recurse into test suite directories.
-        dirnames.clear()
-
-    return ret
+def _find_results_paths(results_dir: str) -> set[str]:
+    return find_marked_directories(results_dir, "results.json")
 
 
 def _find_hw_comparison_paths(output_dir: str) -> set[str]:
-    ret: set[str] = set()
-
-    for root, dirnames, filenames in os.walk(output_dir):
-        if not dirnames:
-            continue
-
-        if "summary.json" not in filenames:
-            continue
-
-        if os.path.basename(root) != "Xbox__Xbox__DirectX__nv2a":
-            continue
-        ret.add(root)
-
-        # No need to recurse into test suite directories.
-        dirnames.clear()
-
-    return ret
+    return find_marked_directories(output_dir, "summary.json", directory_name="Xbox__Xbox__DirectX__nv2a")
 
 
 def _comparison_path_to_source_path(comparison_path: str) -> str:
@@ -67,9 +40,19 @@ def find_result_dirs_without_hw_diffs(results_dir: str, output_dir: str) -> set[
 
 def generate_missing_hw_diffs(results_dir: str, output_dir: str, compare_script: str) -> None:
     results_missing_comparisons = find_result_dirs_without_hw_diffs(results_dir, output_dir)
+    if not results_missing_comparisons:
+        return
+
+    commands = [
+        [compare_script, result, "--output-dir", output_dir, "--verbose"] for result in sorted(results_missing_comparisons)
+    ]
+
+    # The first comparison populates the hardware golden cache, so it is run alone to avoid concurrent clones.
+    subprocess.run(commands[0], check=False)
 
-    for result in results_missing_comparisons:
-        subprocess.run([compare_script, result, "--output-dir", output_dir, "--verbose"], check=False)
+    # The remaining comparisons each get a single job, as there is already one compare.py process per CPU.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(lambda command: subprocess.run([*command, "--jobs", "1"], check=False), commands[1:]))
 
 
 def main() -> int:
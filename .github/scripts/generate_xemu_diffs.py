@@ -6,21 +6,64 @@
 from __future__ import annotations
 
 import argparse
+import bisect
+import contextlib
+import functools
+import gzip
 import json
 import logging
 import os
+import queue
+import re
 import shutil
 import subprocess
 import sys
 import tarfile
-from dataclasses import dataclass
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any
-from urllib.request import urlcleanup, urlretrieve
 
 import requests
+from file_discovery import find_marked_directories
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 logger = logging.getLogger(__name__)
 
+# Cached release info younger than this is used without revalidating it against GitHub.
+_RELEASE_CACHE_TTL_SECONDS = 10 * 60
+
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Number of threads used to overlap small file reads.
+_IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Number of threads writing files while the golden results tarball is decompressed.
+_EXTRACT_WORKERS = 4
+
+
+def _create_session() -> requests.Session:
+    """Creates a Session that keeps connections to GitHub alive across requests."""
+    session = requests.Session()
+    session.headers.update(
+        {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+    )
+    github_token = os.environ.get("GITHUB_TOKEN")
+    if github_token:
+        session.headers["Authorization"] = f"Bearer {github_token}"
+
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
+    return session
+
+
+_SESSION = _create_session()
+
 
 def _filter_release_info_by_tag(release_infos: list[dict[str, Any]], tag: str) -> dict[str, Any] | None:
     for info in release_infos:
@@ -29,19 +72,54 @@ def _filter_release_info_by_tag(release_infos: list[dict[str, Any]], tag: str) -
     return None
 
 
-def _fetch_github_release_info(api_url: str, tag: str = "latest") -> dict[str, Any] | None:
-    full_url = f"{api_url}/releases/latest" if not tag or tag == "latest" else f"{api_url}/releases"
-
-    def fetch_and_filter(url: str):
+def _fetch_cached_release_info(url: str, cache_file: str) -> dict[str, Any] | None:
+    """Fetches release info from the given URL, revalidating a copy cached in `cache_file` via its ETag."""
+    cached: dict[str, Any] | None = None
+    cache_age = None
+    with contextlib.suppress(OSError, ValueError), open(cache_file) as infile:
+        cached = json.load(infile)
+        cache_age = time.time() - os.path.getmtime(cache_file)
+    # Anything other than a complete entry for this URL, e.g. a file written by an older version, is ignored.
+    if not isinstance(cached, dict) or "body" not in cached or cached.get("url") != url:
+        cached = None
+
+    if cached and cache_age is not None and cache_age < _RELEASE_CACHE_TTL_SECONDS:
+        return cached["body"]
+
+    headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+    try:
+        response = _SESSION.get(url, headers=headers, timeout=15)
+        if cached and response.status_code == requests.codes.not_modified:
+            with contextlib.suppress(OSError):
+                os.utime(cache_file)
+            return cached["body"]
+        response.raise_for_status()
+        release_info = response.json()
+
+    except requests.exceptions.RequestException:
+        logger.exception("Failed to retrieve information from %s", url)
+        return None
+
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    with open(cache_file, "w") as outfile:
+        json.dump({"url": url, "etag": response.headers.get("ETag"), "body": release_info}, outfile)
+
+    return release_info
+
+
+def _fetch_github_release_info(
+    api_url: str, tag: str = "latest", cache_file: str | None = None
+) -> dict[str, Any] | None:
+    if not tag or tag == "latest":
+        url = f"{api_url}/releases/latest"
+        if cache_file:
+            return _fetch_cached_release_info(url, cache_file)
+    else:
+        url = f"{api_url}/releases?per_page=100"
+
+    while url:
         try:
-            response = requests.get(
-                url,
-                headers={
-                    "Accept": "application/vnd.github+json",
-                    "X-GitHub-Api-Version": "2022-11-28",
-                },
-                timeout=15,
-            )
+            response = _SESSION.get(url, timeout=15)
             response.raise_for_status()
             release_info = response.json()
 
@@ -54,16 +132,10 @@ def _fetch_github_release_info(api_url: str, tag: str = "latest") -> dict[str, A
         if release_info:
             return release_info
 
-        if not response.links:
-            return None
+        # GitHub carries per_page over into the next link.
+        url = response.links.get("next", {}).get("url")
 
-        next_link = response.links.get("next", {}).get("url")
-        if not next_link:
-            return None
-        next_link = next_link + "&per_page=60"
-        return fetch_and_filter(next_link)
-
-    return fetch_and_filter(full_url)
+    return None
 
 
 def _download_artifact(target_path: str, download_url: str, artifact_path_override: str | None = None) -> bool:
@@ -88,19 +160,75 @@ def _download_artifact(target_path: str, download_url: str, artifact_path_overri
             target_path,
         )
     os.makedirs(os.path.dirname(target_path), exist_ok=True)
-    urlretrieve(download_url, target_path)  # noqa: S310 - checked just above
-    urlcleanup()
+    with _SESSION.get(
+        download_url, headers={"Accept": "application/octet-stream"}, stream=True, timeout=60
+    ) as response:
+        response.raise_for_status()
+        # Reading from the raw stream bypasses requests, so any Content-Encoding must be undone explicitly.
+        response.raw.decode_content = True
+        with open(target_path, "wb") as outfile:
+            shutil.copyfileobj(response.raw, outfile, length=_DOWNLOAD_CHUNK_SIZE)
 
     return True
 
 
+def _extract_tarball(target_file: str, output_dir: str) -> None:
+    """Extracts a gzipped tarball, overlapping decompression with file writes performed on worker threads."""
+    output_root = os.path.realpath(output_dir)
+    output_prefix = os.path.join(output_root, "")
+
+    pending_writes: queue.Queue[tuple[str, bytes] | None] = queue.Queue(maxsize=64)
+    write_errors: list[Exception] = []
+
+    def write_files():
+        while (item := pending_writes.get()) is not None:
+            path, data = item
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as outfile:
+                    outfile.write(data)
+            except OSError as err:
+                write_errors.append(err)
+
+    file_metadata: list[tuple[str, int, float]] = []
+    with ThreadPoolExecutor(max_workers=_EXTRACT_WORKERS) as executor:
+        for _ in range(_EXTRACT_WORKERS):
+            executor.submit(write_files)
+
+        try:
+            with gzip.open(target_file, "rb") as compressed, tarfile.open(fileobj=compressed, mode="r|") as tar:
+                for member in tar:
+                    path = os.path.realpath(os.path.join(output_root, member.name))
+                    if path != output_root and not path.startswith(output_prefix):
+                        msg = f"Refusing to extract '{member.name}' outside of '{output_dir}'"
+                        raise ValueError(msg)
+
+                    if member.isdir():
+                        os.makedirs(path, exist_ok=True)
+                    elif member.isfile():
+                        pending_writes.put((path, tar.extractfile(member).read()))
+                        file_metadata.append((path, member.mode, member.mtime))
+                    else:
+                        tar.extract(member, path=output_root)
+        finally:
+            for _ in range(_EXTRACT_WORKERS):
+                pending_writes.put(None)
+
+    if write_errors:
+        raise write_errors[0]
+
+    for path, mode, mtime in file_metadata:
+        os.chmod(path, mode)
+        os.utime(path, (mtime, mtime))
+
+
 def fetch_latest_xemu_results(api_url: str, cache_dir: str, output_dir: str) -> None:
     logger.info("Fetching xemu golden results artifact")
 
     if not os.path.isdir(output_dir):
         os.makedirs(output_dir, exist_ok=True)
 
-    release_info = _fetch_github_release_info(api_url)
+    release_info = _fetch_github_release_info(api_url, cache_file=os.path.join(cache_dir, "releases_cache.json"))
     if not release_info:
         msg = "Failed to fetch info about xemu golden results artifact"
         raise Exception(msg)
@@ -125,68 +253,95 @@ def fetch_latest_xemu_results(api_url: str, cache_dir: str, output_dir: str) ->
     if not os.path.isfile(target_file):
         _download_artifact(target_file, download_url)
 
-    with tarfile.open(target_file, "r:gz") as tar:
-        already_extracted = True
-        for member in tar.getmembers():
-            if not os.path.exists(os.path.join(output_dir, member.name)):
-                already_extracted = False
-                break
-        if not already_extracted:
-            logger.info("Extracting %s to %s", target_file, output_dir)
-            tar.extractall(path=output_dir)
+    extraction_marker = os.path.join(output_dir, f".extracted-{os.path.basename(target_file)}")
+    if os.path.isfile(extraction_marker):
+        return
+
+    logger.info("Extracting %s to %s", target_file, output_dir)
+    _extract_tarball(target_file, output_dir)
+    with open(extraction_marker, "w"):
+        pass
 
 
 def _find_results_paths(results_dir: str) -> set[str]:
-    ret: set[str] = set()
+    cwd = os.getcwd()
+    cwd_prefix = os.path.join(cwd, "")
+    prefix_length = len(cwd_prefix)
 
-    for root, dirnames, filenames in os.walk(results_dir):
-        if not dirnames:
-            continue
+    return {
+        path[prefix_length:] if path.startswith(cwd_prefix) else os.path.relpath(path, cwd)
+        for path in find_marked_directories(results_dir, "results.json")
+    }
 
-        if "results.json" not in filenames:
-            continue
 
-        ret.add(root)
+# Weights used when scoring how well a golden configuration matches a result configuration. Prefix matches are
+# (score per matching leading character, bonus if one string is a prefix of the other).
+_RENDERER_SCORE = 500000
+_OS_ARCH_SCORE = (100, 100000)
+_GLSL_SCORE = (50, 500)
+_GL_SCORE = (50, 500)
 
-        # No need to recurse into test suite directories.
-        dirnames.clear()
 
-    cwd = os.getcwd()
-    return {os.path.relpath(absolute_path, cwd) for absolute_path in ret}
+def _prefix_match(a: str, b: str, value: int, perfect_bonus: int) -> int:
+    """Scores `value` per leading character shared by a and b, plus `perfect_bonus` if one is a prefix of the other."""
+    common_length = len(os.path.commonprefix((a, b)))
+    ret = common_length * value
+    if common_length == min(len(a), len(b)):
+        ret += perfect_bonus
+    return ret
+
+
+def _max_prefix_match(a: str, value: int, perfect_bonus: int) -> int:
+    """Returns the highest _prefix_match() score attainable against `a`."""
+    return len(a) * value + perfect_bonus
+
+
+# Maps machine_info.txt keys to the ResultsConfiguration attribute they populate.
+_MACHINE_INFO_ATTRIBUTES = {
+    "CPU": "cpu",
+    "OS_Version": "os_version",
+    "GL_VENDOR": "gl_vendor",
+    "GL_RENDERER": "gl_renderer",
+    "GL_VERSION": "gl_version",
+    "GL_SHADING_LANGUAGE_VERSION": "glsl_version",
+}
+_MACHINE_INFO_RE = re.compile(
+    rf"^[^\S\n]*({'|'.join(_MACHINE_INFO_ATTRIBUTES)}):[^\S\n]*(.*?)[^\S\n]*$",
+    re.MULTILINE,
+)
 
 
-@dataclass
 class ResultsConfiguration:
-    cpu: str = "any"
-    os_version = "any"
-    gl_vendor = "any"
-    gl_renderer = "any"
-    gl_version = "any"
-    glsl_version = "any"
-    renderer = "OpenGL"
-    sanitized_glsl = "any"
-    sanitized_gl = "any"
-    sanitized_os_arch = "any"
-
-    def __init__(self, results_path: str, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    __slots__ = (
+        "cpu",
+        "gl_renderer",
+        "gl_vendor",
+        "gl_version",
+        "glsl_version",
+        "os_version",
+        "renderer",
+        "sanitized_gl",
+        "sanitized_glsl",
+        "sanitized_os_arch",
+    )
+
+    def __init__(self, results_path: str):
+        self.cpu = "any"
+        self.os_version = "any"
+        self.gl_vendor = "any"
+        self.gl_renderer = "any"
+        self.gl_version = "any"
+        self.glsl_version = "any"
+        self.renderer = "OpenGL"
+
         with open(os.path.join(results_path, "machine_info.txt")) as machine_info:
-            for full_line in machine_info:
-                line = full_line.strip()
-                if line.startswith("CPU:"):
-                    self.cpu = line.split(":", 1)[1].strip()
-                elif line.startswith("OS_Version:"):
-                    self.os_version = line.split(":", 1)[1].strip()
-                elif line.startswith("GL_VENDOR:"):
-                    self.gl_vendor = line.split(":", 1)[1].strip()
-                elif line.startswith("GL_RENDERER:"):
-                    self.gl_renderer = line.split(":", 1)[1].strip()
-                elif line.startswith("GL_VERSION:"):
-                    self.gl_version = line.split(":", 1)[1].strip()
-                elif line.startswith("GL_SHADING_LANGUAGE_VERSION:"):
-                    self.glsl_version = line.split(":", 1)[1].strip()
-                elif line.startswith("- VK_"):
-                    self.renderer = "Vulkan"
+            content = machine_info.read()
+
+        for key, value in _MACHINE_INFO_RE.findall(content):
+            setattr(self, _MACHINE_INFO_ATTRIBUTES[key], value)
+
+        if "\n- VK_" in content:
+            self.renderer = "Vulkan"
 
         path_components = results_path.split(os.path.sep)
         self.sanitized_glsl = path_components[-1]
@@ -194,60 +349,114 @@ class ResultsConfiguration:
         self.sanitized_os_arch = path_components[-3]
 
     def score(self, other: ResultsConfiguration) -> int:
-        def prefix_match(a: str, b: str, value: int, perfect_bonus: int) -> int:
-            ret = 0
-            for idx in range(min(len(a), len(b))):
-                if a[idx] != b[idx]:
-                    return ret
-                ret += value
-            return ret + perfect_bonus
-
         ret = 0
 
         # Prefer matching renderer path, even across different OS/GPUs
         if self.renderer == other.renderer:
-            ret += 500000
+            ret += _RENDERER_SCORE
 
         # Prefer the same OS + architecture, falling back to the same OS
-        ret += prefix_match(self.sanitized_os_arch, other.sanitized_os_arch, 100, 100000)
+        ret += _prefix_match(self.sanitized_os_arch, other.sanitized_os_arch, *_OS_ARCH_SCORE)
 
         # Slightly prefer matching GLSL
-        ret += prefix_match(self.glsl_version, other.glsl_version, 50, 500)
+        ret += _prefix_match(self.glsl_version, other.glsl_version, *_GLSL_SCORE)
 
         # Slightly prefer matching GL
-        ret += prefix_match(self.gl_version, other.gl_version, 50, 500)
+        ret += _prefix_match(self.gl_version, other.gl_version, *_GL_SCORE)
+
+        return ret
+
+    def score_above(self, other: ResultsConfiguration, threshold: int) -> int | None:
+        """Returns score(other) if it exceeds `threshold`, otherwise None.
+
+        Fields are scored in descending order of weight and scoring stops as soon as the remaining fields cannot lift
+        the total above `threshold`.
+        """
+        ret = _RENDERER_SCORE if self.renderer == other.renderer else 0
+        ret += _prefix_match(self.sanitized_os_arch, other.sanitized_os_arch, *_OS_ARCH_SCORE)
 
+        max_gl = _max_prefix_match(self.gl_version, *_GL_SCORE)
+        if ret + _max_prefix_match(self.glsl_version, *_GLSL_SCORE) + max_gl <= threshold:
+            return None
+        ret += _prefix_match(self.glsl_version, other.glsl_version, *_GLSL_SCORE)
+
+        if ret + max_gl <= threshold:
+            return None
+        ret += _prefix_match(self.gl_version, other.gl_version, *_GL_SCORE)
+
+        return ret if ret > threshold else None
+
+    def score_upper_bound(self, os_arch_common_length: int, *, renderer_matches: bool) -> int:
+        """Returns the highest score() attainable by a configuration sharing the given OS + arch prefix length."""
+        ret = _RENDERER_SCORE if renderer_matches else 0
+        ret += os_arch_common_length * _OS_ARCH_SCORE[0] + _OS_ARCH_SCORE[1]
+        ret += _max_prefix_match(self.glsl_version, *_GLSL_SCORE)
+        ret += _max_prefix_match(self.gl_version, *_GL_SCORE)
         return ret
 
 
+@functools.lru_cache(maxsize=None)
+def _load_config_from_realpath(results_realpath: str) -> ResultsConfiguration:
+    return ResultsConfiguration(results_realpath)
+
+
+def _load_config(results_path: str) -> ResultsConfiguration:
+    """Returns the ResultsConfiguration for the given dir, shared by every path that resolves to the same location."""
+    return _load_config_from_realpath(os.path.realpath(results_path))
+
+
+def _os_arch_key(item: tuple[str, ResultsConfiguration]) -> str:
+    return item[1].sanitized_os_arch
+
+
 def _find_best_comparator(
-    results: ResultsConfiguration, golden_paths: dict[str, ResultsConfiguration]
+    results: ResultsConfiguration, golden_configurations: dict[str, list[tuple[str, ResultsConfiguration]]]
 ) -> tuple[str, ResultsConfiguration]:
-    """Finds the golden results dir that is the best comparison for the given dir."""
+    """Finds the golden results dir that is the best comparison for the given dir.
+
+    A renderer match outweighs every other component of the score, so only goldens sharing the renderer are
+    considered unless there are none. Candidates are sorted by OS + architecture, so the search starts at the closest
+    name and moves outward until the shared prefix is too short for any remaining candidate to beat the best score.
+    """
+    candidates = golden_configurations.get(results.renderer)
+    renderer_matches = bool(candidates)
+    if not candidates:
+        candidates = sorted(
+            (item for bucket in golden_configurations.values() for item in bucket),
+            key=_os_arch_key,
+        )
 
     best_config = None
-    best_score = 0
-
-    for item in golden_paths.items():
-        if not best_config:
-            best_config = item
-            best_score = results.score(item[1])
-            continue
+    best_score = -1
+
+    target = results.sanitized_os_arch
+    start = bisect.bisect_left(candidates, target, key=_os_arch_key)
+    for indices in (range(start, len(candidates)), range(start - 1, -1, -1)):
+        for index in indices:
+            item = candidates[index]
+            common_length = len(os.path.commonprefix((target, item[1].sanitized_os_arch)))
+            if results.score_upper_bound(common_length, renderer_matches=renderer_matches) <= best_score:
+                break
 
-        score = results.score(item[1])
-        if score > best_score:
-            best_config = item
-            best_score = score
+            score = results.score_above(item[1], best_score)
+            if score is not None:
+                best_config = item
+                best_score = score
 
     return best_config
 
 
-def _build_golden_configurations(golden_dir: str) -> dict[str, ResultsConfiguration]:
-    golden_paths = _find_results_paths(golden_dir)
-    ret: dict[str, ResultsConfiguration] = {}
+def _build_golden_configurations(golden_dir: str) -> dict[str, list[tuple[str, ResultsConfiguration]]]:
+    """Returns (path, configuration) pairs for each golden results dir, keyed by renderer and sorted by OS + arch."""
+    ret: dict[str, list[tuple[str, ResultsConfiguration]]] = defaultdict(list)
+
+    golden_paths = list(_find_results_paths(golden_dir))
+    with ThreadPoolExecutor(max_workers=_IO_WORKERS) as executor:
+        for path, config in zip(golden_paths, executor.map(_load_config, golden_paths)):
+            ret[config.renderer].append((path, config))
 
-    for path in golden_paths:
-        ret[path] = ResultsConfiguration(path)
+    for bucket in ret.values():
+        bucket.sort(key=_os_arch_key)
 
     return ret
 
@@ -258,45 +467,90 @@ def find_result_dirs_without_golden_diffs(
     result_paths = _find_results_paths(results_dir)
     golden_configurations = _build_golden_configurations(golden_dir)
 
+    if force:
+        pending_paths = list(result_paths)
+    else:
+        output_prefix = os.path.join(output_dir, "")
+        pending_paths = [
+            path for path in result_paths if not os.path.isdir(output_prefix + path.partition(os.path.sep)[2])
+        ]
+
     ret: list[tuple[str, str]] = []
 
-    for path in result_paths:
-        path_components = path.split(os.path.sep)
-        target_dir = os.path.join(output_dir, *path_components[1:])
-        if os.path.isdir(target_dir) and not force:
-            continue
+    with ThreadPoolExecutor(max_workers=_IO_WORKERS) as executor:
+        for path, results_config in zip(pending_paths, executor.map(_load_config, pending_paths)):
+            golden_path, golden_configuration = _find_best_comparator(results_config, golden_configurations)
+            ret.append((path, golden_path))
 
-        results_config = ResultsConfiguration(path)
-        golden_path, golden_configuration = _find_best_comparator(results_config, golden_configurations)
+    return ret
 
-        ret.append((path, golden_path))
 
-    return ret
+def _load_registry(registry_file: str) -> dict[str, str]:
+    try:
+        with open(registry_file) as infile:
+            return json.load(infile)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_registry(registry_file: str, registry: dict[str, str]):
+    """Writes the comparison registry via a temporary file so an interrupted run never leaves a truncated file."""
+    temp_file = f"{registry_file}.tmp"
+    with open(temp_file, "w") as outfile:
+        json.dump(registry, outfile, indent=2)
+    os.replace(temp_file, registry_file)
 
 
 def generate_diffs(results_dir: str, golden_dir: str, compare_script: str, cache_dir: str, output_dir: str):
     required_comparisons = find_result_dirs_without_golden_diffs(results_dir, golden_dir, output_dir)
 
-    registry = {}
-    for result, golden in required_comparisons:
-        registry[result] = golden
-        subprocess.run(
-            [
-                compare_script,
-                result,
-                "--against",
-                golden,
-                "--output-dir",
-                output_dir,
-                "--cache-path",
-                cache_dir,
-                "--verbose",
-            ],
-            check=False,
-        )
+    # Keep entries from earlier runs, since their diffs are skipped by find_result_dirs_without_golden_diffs.
+    os.makedirs(output_dir, exist_ok=True)
+    registry_file = os.path.join(output_dir, "comparisons.json")
+    registry = _load_registry(registry_file)
+
+    # Each worker handles its share of the comparisons in a single compare.py process to amortize interpreter startup.
+    num_workers = min(os.cpu_count() or 1, len(required_comparisons))
+    # The CPUs are divided between the workers so that their own concurrent comparisons do not oversubscribe them.
+    jobs_per_worker = max(1, (os.cpu_count() or 1) // max(1, num_workers))
+    # The manifests are only needed while the workers run, so they are kept out of the persistent cache directory.
+    with tempfile.TemporaryDirectory() as manifest_dir:
+        commands = []
+        for worker in range(num_workers):
+            manifest = os.path.join(manifest_dir, f"pending_comparisons-{worker}.json")
+            with open(manifest, "w") as outfile:
+                json.dump(required_comparisons[worker::num_workers], outfile)
+
+            commands.append(
+                (
+                    worker,
+                    [
+                        compare_script,
+                        "--manifest",
+                        manifest,
+                        "--output-dir",
+                        output_dir,
+                        "--cache-path",
+                        cache_dir,
+                        "--jobs",
+                        str(jobs_per_worker),
+                        "--verbose",
+                    ],
+                )
+            )
 
-    with open(os.path.join(output_dir, "comparisons.json"), "w") as outfile:
-        json.dump(registry, outfile, indent=2)
+        if commands:
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                futures = {
+                    executor.submit(subprocess.run, command, check=False): worker for worker, command in commands
+                }
+                # Record each worker's share as soon as it finishes so an interrupted run keeps its progress.
+                for future in as_completed(futures):
+                    future.result()
+                    registry.update(required_comparisons[futures[future] :: num_workers])
+                    _write_registry(registry_file, registry)
+
+    _write_registry(registry_file, registry)
 
     known_issues_file = os.path.join(golden_dir, "results", "known_issues.json")
     if os.path.isfile(known_issues_file):
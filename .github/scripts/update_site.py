@@ -6,19 +6,35 @@ from __future__ import annotations
 
 import argparse
 import dataclasses
-import glob
+import functools
 import json
 import os
-import re
 import sys
 from collections import defaultdict
 from dataclasses import dataclass
+from fnmatch import fnmatchcase
 from typing import Any
 
-from jinja2 import Environment, FileSystemLoader
+from file_discovery import find_files
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
+# orjson is optional, but considerably faster at loading large comparison registries.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
-@dataclass
+
+@functools.lru_cache(maxsize=None)
+def _comparator_to_pattern(comparator: str) -> str:
+    """Converts a known issue filter comparator into an fnmatch pattern.
+
+    Comparators only treat `*` as special and match any value that they are a prefix of.
+    """
+    return comparator.replace("[", "[[]").replace("?", "[?]") + "*"
+
+
+@dataclass(slots=True)
 class DiffLink:
     # Info about the test artifact.
     filename: str
@@ -43,71 +59,71 @@ class DiffLink:
 
     known_issues: list[str] = dataclasses.field(default_factory=list)
 
-    @property
-    def sort_key(self) -> str:
-        return f"{self.suite}/{self.filename}"
+    # Derived from the immutable artifact info in __post_init__.
+    sort_key: str = dataclasses.field(init=False)
+    test_name: str = dataclasses.field(init=False)
+
+    # Maps known issue filter keys to the attribute they are matched against, most selective first so mismatches are
+    # rejected as early as possible.
+    _COMPARATOR_ATTRS = (("platform", "machine"), ("gl", "gl"), ("glsl", "glsl"))
+
+    def __post_init__(self):
+        self.sort_key = f"{self.suite}/{self.filename}"
+        self.test_name = self.filename[:-4]
 
     @property
     def has_diff(self) -> bool:
         return bool(self.hw_diff_image or self.xemu_diff_image)
 
-    @property
-    def test_name(self) -> str:
-        return self.filename[:-4]
+    def add_known_issues(self, registry: dict[str, Any], suite_issues_cache: dict[tuple[str, ...], list[str]]):
+        """Adds matching known issues from the registry.
 
-    def add_known_issues(self, registry: dict[str, Any]):
+        Suite-level issues only depend on the suite and machine info, so they are resolved once per unique combination
+        and shared through `suite_issues_cache`.
+        """
         known_issues = registry.get(self.suite)
         if not known_issues:
             return
 
-        for issue in known_issues.get("issues", []):
-            self._process_known_issue(issue)
+        cache_key = (self.suite, self.machine, self.gl, self.glsl)
+        suite_issues = suite_issues_cache.get(cache_key)
+        if suite_issues is None:
+            suite_issues = self._resolve_known_issues(known_issues.get("issues", []))
+            suite_issues_cache[cache_key] = suite_issues
+        self.known_issues.extend(suite_issues)
 
         test_issues = known_issues.get(self.test_name)
         if test_issues:
-            for issue in test_issues.get("issues", []):
-                self._process_known_issue(issue)
+            self.known_issues.extend(self._resolve_known_issues(test_issues.get("issues", [])))
 
-    def _process_known_issue(self, issue: dict[str, Any]):
-        # Check for a suite-level issue
-        suite_issue_text = issue.get("text")
-        if suite_issue_text and self._should_apply(issue.get("filter", {})):
-            self.known_issues.append(suite_issue_text)
+    def _resolve_known_issues(self, issues: list[dict[str, Any]]) -> list[str]:
+        """Returns the text of each issue whose filter applies to this result."""
+        return [
+            issue["text"] for issue in issues if issue.get("text") and self._should_apply(issue.get("filter", {}))
+        ]
 
     @staticmethod
     def _match(comparator: str, value: str) -> bool:
-        elements = comparator.split("*")
-        comparison = r".*".join([re.escape(component) for component in elements])
-
-        match = re.match(comparison, value)
-        return bool(match)
-
-    def _matches_platform(self, comparator: str) -> bool:
-        return self._match(comparator, self.machine)
-
-    def _matches_gl(self, comparator: str) -> bool:
-        return self._match(comparator, self.gl)
-
-    def _matches_glsl(self, comparator: str) -> bool:
-        return self._match(comparator, self.glsl)
+        return fnmatchcase(value, _comparator_to_pattern(comparator))
 
     def _should_apply(self, filter: dict[str, Any]) -> bool:
-        for comparator_key, match_func in {"platform": self._matches_platform, "gl": self._matches_gl, "glsl": self._matches_glsl}.items():
-            comparators = filter.get(comparator_key)
-            if not comparators:
-                continue
+        """Returns True if the filter and all of its nested subfilters match this result."""
+        if not filter:
+            return True
+
+        pending = [filter]
+        while pending:
+            current = pending.pop()
+            for comparator_key, attribute in self._COMPARATOR_ATTRS:
+                comparators = current.get(comparator_key)
+                if not comparators:
+                    continue
 
-            match = False
-            for comparator in comparators:
-                if match_func(comparator):
-                    match = True
-                    break
-            if not match:
-                return False
+                value = getattr(self, attribute)
+                if not any(self._match(comparator, value) for comparator in comparators):
+                    return False
 
-        for subfilter in filter.get("subfilters", []):
-            if not self._should_apply(subfilter):
-                return False
+            pending.extend(current.get("subfilters", []))
 
         return True
 
@@ -143,24 +159,35 @@ class Generator:
 
         self.results: dict[str, DiffLink] = {}
         if not self.top_index_only:
-            self._find_results()
-            self._find_hw_diffs()
-            self._find_xemu_diffs()
-
-    def _find_results(self):
-        for result in glob.glob("**/*.png", root_dir=self.results_dir, recursive=True):
-            components = result.split(os.path.sep)
-            suite, filename = components[-2:]
-            machine, gl, glsl = components[-5:-2]
-            diff_key = os.path.join(suite, filename)
-            self.results[diff_key] = DiffLink(
-                filename=filename,
-                suite=suite,
-                machine=machine,
-                gl=gl,
-                glsl=glsl,
-                result_url=f"{self.results_base_url}/results/{result}",
-            )
+            self._crawl()
+
+    def _crawl(self):
+        """Crawls the results and both comparison dirs concurrently, then links each diff to its result."""
+        results, hw_diffs, xemu_diffs = find_files(
+            (self.results_dir, self.hw_golden_comparison, self.xemu_golden_comparison), ".png"
+        )
+
+        for result in results:
+            self._add_result(result)
+        self._link_hw_diffs(hw_diffs)
+        self._link_xemu_diffs(xemu_diffs)
+
+    def _add_result(self, result: str):
+        # Only the trailing machine/gl/glsl/suite/filename components are needed.
+        components = result.rsplit(os.path.sep, 5)
+        filename = components[-1]
+        # There are only a handful of distinct suites and machine configurations, so share a single copy of each.
+        suite = sys.intern(components[-2])
+        machine, gl, glsl = (sys.intern(component) for component in components[-5:-2])
+        diff_key = f"{suite}/{filename}"
+        self.results[diff_key] = DiffLink(
+            filename=filename,
+            suite=suite,
+            machine=machine,
+            gl=gl,
+            glsl=glsl,
+            result_url=f"{self.results_base_url}/results/{result}",
+        )
 
     def _home_url(self, output_dir: str) -> str:
         return f"{os.path.relpath(self.output_dir, output_dir)}/index.html"
@@ -168,37 +195,47 @@ class Generator:
     def _make_site_url(self, path: str) -> str:
         return f"{self.site_resources_base_url}/{os.path.basename(self.output_dir)}/{path}"
 
-    def _find_hw_diffs(self):
+    def _link_hw_diffs(self, hw_diffs: list[str]):
         hw_diff_relative_path = self.hw_golden_comparison.replace(self.output_dir, "")
-        for hw_diff in glob.glob("**/*.png", root_dir=self.hw_golden_comparison, recursive=True):
-            suite, filename = hw_diff.split(os.path.sep)[-2:]
+        sep = os.path.sep
+        for hw_diff in hw_diffs:
+            suite, filename = hw_diff.rsplit(sep, 2)[-2:]
             golden_filename = filename.replace("-diff.png", ".png")
-            diff_link = self.results[os.path.join(suite, golden_filename)]
+            diff_link = self.results[f"{suite}/{golden_filename}"]
 
             diff_link.hw_diff_image = hw_diff
             diff_link.hw_diff_url = self._make_site_url(f"{hw_diff_relative_path}/{hw_diff}")
             diff_link.hw_golden_url = f"{self.hw_golden_base_url}/results/{suite}/{golden_filename}"
 
-    def _find_xemu_diffs(self):
+    def _link_xemu_diffs(self, xemu_diffs: list[str]):
         xemu_diff_relative_path = self.xemu_golden_comparison.replace(self.output_dir, "")
 
-        with open(os.path.join(self.xemu_golden_comparison, "comparisons.json")) as infile:
-            comparison_registry = json.load(infile)
+        with open(os.path.join(self.xemu_golden_comparison, "comparisons.json"), "rb") as infile:
+            comparison_registry = _json_loads(infile.read())
+
+        # Every diff from the same results dir shares the same golden, so the golden subpath is resolved once per dir.
+        xemu_subpaths: dict[tuple[str, ...], str] = {}
 
-        for xemu_diff in glob.glob("**/*.png", root_dir=self.xemu_golden_comparison, recursive=True):
-            components = xemu_diff.split(os.path.sep)
+        sep = os.path.sep
+        for xemu_diff in xemu_diffs:
+            components = xemu_diff.split(sep)
             # The first 4 components of the path will be xemu_version/os_arch/gl_info/glsl_info
-            results_key = os.path.join("results", *components[:4])
+            results_components = tuple(components[:4])
+
+            xemu_subpath = xemu_subpaths.get(results_components)
+            if xemu_subpath is None:
+                results_key = os.path.join("results", *results_components)
+                xemu_golden_info = comparison_registry.get(results_key)
+                if not xemu_golden_info:
+                    msg = f"Failed to lookup comparison database for xemu diff '{xemu_diff}' from {comparison_registry}"
+                    raise ValueError(msg)
+                xemu_subpath = "/".join(xemu_golden_info.split(sep)[2:])
+                xemu_subpaths[results_components] = xemu_subpath
 
-            xemu_golden_info = comparison_registry.get(results_key)
-            if not xemu_golden_info:
-                msg = f"Failed to lookup comparison database for xemu diff '{xemu_diff}' from {comparison_registry}"
-                raise ValueError(msg)
             suite, filename = components[-2:]
             golden_filename = filename.replace("-diff.png", ".png")
-            diff_link = self.results[os.path.join(suite, golden_filename)]
+            diff_link = self.results[f"{suite}/{golden_filename}"]
 
-            xemu_subpath = "/".join(xemu_golden_info.split(os.path.sep)[2:])
             diff_link.xemu_build_info = xemu_subpath
             diff_link.xemu_diff_image = xemu_diff
             diff_link.xemu_diff_url = self._make_site_url(f"{xemu_diff_relative_path}/{xemu_diff}")
@@ -223,59 +260,57 @@ class Generator:
         else:
             known_issues_registry = {}
 
+        suite_issues_cache: dict[tuple[str, ...], list[str]] = {}
         diffs_by_xemu_version: dict[str, dict[str, list[DiffLink]]] = defaultdict(lambda: defaultdict(list))
         for diff in self.results.values():
             if not diff.xemu_diff_url:
                 continue
-            diff.add_known_issues(known_issues_registry)
+            diff.add_known_issues(known_issues_registry, suite_issues_cache)
             diffs_by_xemu_version[diff.xemu_build_info][diff.suite].append(diff)
 
         with open(os.path.join(output_dir, "index.html"), "w") as outfile:
             comparison_template = self.env.get_template("comparison_result.html.j2")
-            outfile.write(
-                comparison_template.render(
-                    diffs_by_xemu_version=diffs_by_xemu_version,
-                    branch=self.branch,
-                    css_dir=os.path.relpath(self.css_output_dir, output_dir),
-                    js_dir=os.path.relpath(self.js_output_dir, output_dir),
-                    home_url=self._home_url(output_dir),
-                )
-            )
+            comparison_template.stream(
+                diffs_by_xemu_version=diffs_by_xemu_version,
+                branch=self.branch,
+                css_dir=os.path.relpath(self.css_output_dir, output_dir),
+                js_dir=os.path.relpath(self.js_output_dir, output_dir),
+                home_url=self._home_url(output_dir),
+            ).dump(outfile)
 
     def _generate_index_page(self):
-        comparison_pages: dict[str, str] = {}
-
-        for page in glob.glob("**/index.html", root_dir=self.output_dir, recursive=True):
-            if page == "index.html":
-                continue
-            comparison_pages[os.path.dirname(page)] = page
+        # Each comparison page lives directly within a per-branch subdirectory of the output dir.
+        with os.scandir(self.output_dir) as entries:
+            comparison_pages = {
+                entry.name: f"{entry.name}/index.html"
+                for entry in entries
+                if not entry.name.startswith(".")
+                and entry.is_dir(follow_symlinks=False)
+                and os.path.isfile(os.path.join(entry.path, "index.html"))
+            }
 
         index_template = self.env.get_template("index.html.j2")
         output_dir = self.output_dir
 
         with open(os.path.join(output_dir, "index.html"), "w") as outfile:
-            outfile.write(
-                index_template.render(
-                    comparison_pages=comparison_pages,
-                    css_dir=os.path.relpath(self.css_output_dir, output_dir),
-                    js_dir=os.path.relpath(self.js_output_dir, output_dir),
-                )
-            )
+            index_template.stream(
+                comparison_pages=comparison_pages,
+                css_dir=os.path.relpath(self.css_output_dir, output_dir),
+                js_dir=os.path.relpath(self.js_output_dir, output_dir),
+            ).dump(outfile)
 
     def _write_css(self) -> None:
         css_template = self.env.get_template("site.css.j2")
         with open(os.path.join(self.css_output_dir, "site.css"), "w") as outfile:
-            outfile.write(
-                css_template.render(
-                    comparison_golden_outline_size=6,
-                    title_bar_height=40,
-                )
-            )
+            css_template.stream(
+                comparison_golden_outline_size=6,
+                title_bar_height=40,
+            ).dump(outfile)
 
     def _write_js(self) -> None:
         css_template = self.env.get_template("script.js.j2")
         with open(os.path.join(self.js_output_dir, "script.js"), "w") as outfile:
-            outfile.write(css_template.render())
+            css_template.stream().dump(outfile)
 
     def generate_site(self) -> int:
         self._write_css()
@@ -287,8 +322,8 @@ class Generator:
 
 
 def _load_known_issues(known_issues_file: str) -> dict[str, Any]:
-    with open(known_issues_file) as infile:
-        content = json.load(infile)
+    with open(known_issues_file, "rb") as infile:
+        content = _json_loads(infile.read())
         known_issues = content.get("known_issues", {})
 
     def sanitize_name(name: str) -> str:
@@ -347,6 +382,11 @@ def main() -> int:
         "--templates-dir",
         help="Directory containing the templates used to render the site.",
     )
+    parser.add_argument(
+        "--cache-dir",
+        default="cache",
+        help="Directory into which files that may be useful across runs should be placed",
+    )
     parser.add_argument(
         "--top-index-only",
         action="store_true",
@@ -373,7 +413,15 @@ def main() -> int:
     if not args.templates_dir:
         args.templates_dir = os.path.join(os.path.dirname(__file__), "site-templates")
 
-    jinja_env = Environment(loader=FileSystemLoader(args.templates_dir))
+    # Compiled templates are cached within the cache dir so that CI can persist them between runs. Entries are keyed
+    # on the template source checksum, so edited templates are simply recompiled.
+    bytecode_cache_dir = os.path.join(os.path.abspath(os.path.expanduser(args.cache_dir)), "jinja_bytecode")
+    os.makedirs(bytecode_cache_dir, exist_ok=True)
+    jinja_env = Environment(
+        loader=FileSystemLoader(args.templates_dir),
+        bytecode_cache=FileSystemBytecodeCache(bytecode_cache_dir),
+        auto_reload=False,
+    )
     jinja_env.globals["sidenav_width"] = 48
     jinja_env.globals["sidenav_icon_width"] = 32
 
@@ -3,15 +3,23 @@
 from __future__ import annotations
 
 import argparse
-import glob
 import json
 import os
 import sys
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from operator import attrgetter
 
+from file_discovery import find_files
 
-@dataclass
+# orjson is optional, but considerably faster at loading large comparison registries.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+
+@dataclass(slots=True)
 class DiffLink:
     filename: str
     suite: str
@@ -26,9 +34,13 @@ class DiffLink:
     xemu_diff_url: str = ""
     xemu_golden_url: str = ""
 
-    @property
-    def sort_key(self) -> str:
-        return f"{self.suite}/{self.filename}"
+    # Derived from the immutable artifact info in __post_init__.
+    sort_key: str = field(init=False)
+    test_name: str = field(init=False)
+
+    def __post_init__(self):
+        self.sort_key = f"{self.suite}/{self.filename}"
+        self.test_name = self.filename[:-4]
 
     @property
     def has_diff(self) -> bool:
@@ -61,49 +73,69 @@ class Generator:
         self.output_dir = output_dir
 
         self.results: dict[str, DiffLink] = {}
-        self._find_results()
-        self._find_hw_diffs()
-        self._find_xemu_diffs()
-
-    def _find_results(self):
-        for result in glob.glob("**/*.png", root_dir=self.results_dir, recursive=True):
-            suite, filename = result.split(os.path.sep)[-2:]
-            diff_key = os.path.join(suite, filename)
-            self.results[diff_key] = DiffLink(
-                filename=filename, suite=suite, result_url=f"{self.results_base_url}/results/{result}"
-            )
-
-    def _find_hw_diffs(self):
+        self._crawl()
+
+    def _crawl(self):
+        """Crawls the results and both comparison dirs concurrently, then links each diff to its result."""
+        results, hw_diffs, xemu_diffs = find_files(
+            (self.results_dir, self.hw_golden_comparison, self.xemu_golden_comparison), ".png"
+        )
+
+        for result in results:
+            self._add_result(result)
+        self._link_hw_diffs(hw_diffs)
+        self._link_xemu_diffs(xemu_diffs)
+
+    def _add_result(self, result: str):
+        suite, filename = result.rsplit(os.path.sep, 2)[-2:]
+        # There are only a handful of distinct suites, so share a single copy of each.
+        suite = sys.intern(suite)
+        diff_key = f"{suite}/{filename}"
+        self.results[diff_key] = DiffLink(
+            filename=filename, suite=suite, result_url=f"{self.results_base_url}/results/{result}"
+        )
+
+    def _link_hw_diffs(self, hw_diffs: list[str]):
         hw_diff_relative_path = self.hw_golden_comparison.replace(self.output_dir, "")
-        for hw_diff in glob.glob("**/*.png", root_dir=self.hw_golden_comparison, recursive=True):
-            suite, filename = hw_diff.split(os.path.sep)[-2:]
+        sep = os.path.sep
+        for hw_diff in hw_diffs:
+            suite, filename = hw_diff.rsplit(sep, 2)[-2:]
             golden_filename = filename.replace("-diff.png", ".png")
-            diff_link = self.results[os.path.join(suite, golden_filename)]
+            diff_link = self.results[f"{suite}/{golden_filename}"]
 
             diff_link.hw_diff_image = hw_diff
             diff_link.hw_diff_url = f"{hw_diff_relative_path}/{hw_diff}"
             diff_link.hw_golden_url = f"{self.hw_golden_base_url}/results/{suite}/{golden_filename}"
 
-    def _find_xemu_diffs(self):
+    def _link_xemu_diffs(self, xemu_diffs: list[str]):
         xemu_diff_relative_path = self.xemu_golden_comparison.replace(self.output_dir, "")
 
-        with open(os.path.join(self.xemu_golden_comparison, "comparisons.json")) as infile:
-            comparison_registry = json.load(infile)
+        with open(os.path.join(self.xemu_golden_comparison, "comparisons.json"), "rb") as infile:
+            comparison_registry = _json_loads(infile.read())
 
-        for xemu_diff in glob.glob("**/*.png", root_dir=self.xemu_golden_comparison, recursive=True):
-            components = xemu_diff.split(os.path.sep)
+        # Every diff from the same results dir shares the same golden, so the golden subpath is resolved once per dir.
+        xemu_subpaths: dict[tuple[str, ...], str] = {}
+
+        sep = os.path.sep
+        for xemu_diff in xemu_diffs:
+            components = xemu_diff.split(sep)
             # The first 4 components of the path will be xemu_version/os_arch/gl_info/glsl_info
-            results_key = os.path.join("results", *components[:4])
+            results_components = tuple(components[:4])
+
+            xemu_subpath = xemu_subpaths.get(results_components)
+            if xemu_subpath is None:
+                results_key = os.path.join("results", *results_components)
+                xemu_golden_info = comparison_registry.get(results_key)
+                if not xemu_golden_info:
+                    msg = f"Failed to lookup comparison database for xemu diff '{xemu_diff}' from {comparison_registry}"
+                    raise ValueError(msg)
+                xemu_subpath = "/".join(xemu_golden_info.split(sep)[2:])
+                xemu_subpaths[results_components] = xemu_subpath
 
-            xemu_golden_info = comparison_registry.get(results_key)
-            if not xemu_golden_info:
-                msg = f"Failed to lookup comparison database for xemu diff '{xemu_diff}' from {comparison_registry}"
-                raise ValueError(msg)
             suite, filename = components[-2:]
             golden_filename = filename.replace("-diff.png", ".png")
-            diff_link = self.results[os.path.join(suite, golden_filename)]
+            diff_link = self.results[f"{suite}/{golden_filename}"]
 
-            xemu_subpath = "/".join(xemu_golden_info.split(os.path.sep)[2:])
             diff_link.xemu_build_info = xemu_subpath
             diff_link.xemu_diff_image = xemu_diff
             diff_link.xemu_diff_url = f"{xemu_diff_relative_path}/{xemu_diff}"
@@ -117,58 +149,58 @@ class Generator:
         # status quo.
         # diffs_vs_hw = {diff.sort_key: diff for diff in self.results.values() if diff.hw_diff_url}
 
+        # Sorting once up front keeps every per-version and per-suite bucket below in filename order.
         diffs_by_xemu_version: dict[str, list[DiffLink]] = defaultdict(list)
-        for diff in self.results.values():
+        for diff in sorted(self.results.values(), key=attrgetter("filename")):
             if not diff.xemu_diff_url:
                 continue
             diffs_by_xemu_version[diff.xemu_build_info].append(diff)
 
-        with open(page_filename, "w") as outfile:
-            outfile.writelines(
-                [
-                    f"{self.page_title}\n",
-                    "===\n",
-                ]
-            )
-
-            for xemu_version in sorted(diffs_by_xemu_version):
-                outfile.write(f"# {xemu_version}\n")
-
-                results_by_suite = defaultdict(list)
-                for result in diffs_by_xemu_version[xemu_version]:
-                    results_by_suite[result.suite].append(result)
-
-                for suite in sorted(results_by_suite):
-                    outfile.write(f"## {suite}\n")
-
-                    for diff in sorted(results_by_suite[suite], key=lambda x: x.filename):
-                        diff: DiffLink
-                        test_name = diff.filename[:-4]
-                        outfile.writelines(
+        lines = [
+            f"{self.page_title}\n",
+            "===\n",
+        ]
+
+        for xemu_version in sorted(diffs_by_xemu_version):
+            lines.append(f"# {xemu_version}\n")
+
+            results_by_suite = defaultdict(list)
+            for result in diffs_by_xemu_version[xemu_version]:
+                results_by_suite[result.suite].append(result)
+
+            for suite in sorted(results_by_suite):
+                lines.append(f"## {suite}\n")
+
+                for diff in results_by_suite[suite]:
+                    diff: DiffLink
+                    lines.extend(
+                        [
+                            f"### {diff.test_name}\n",
+                            "#### PR\n",
+                            f"![{diff.result_url}]({diff.result_url})\n",
+                            f"#### {xemu_version}\n",
+                            f"![{diff.xemu_golden_url}]({diff.xemu_golden_url})\n",
+                            f"### PR vs {xemu_version}\n",
+                            f"[[{diff.xemu_diff_url}|{diff.xemu_diff_url}]]\n",
+                        ]
+                    )
+
+                    if diff.hw_golden_url:
+                        lines.extend(
                             [
-                                f"### {test_name}\n",
-                                "#### PR\n",
-                                f"![{diff.result_url}]({diff.result_url})\n",
-                                f"#### {xemu_version}\n",
-                                f"![{diff.xemu_golden_url}]({diff.xemu_golden_url})\n",
-                                f"### PR vs {xemu_version}\n",
-                                f"[[{diff.xemu_diff_url}|{diff.xemu_diff_url}]]\n",
+                                "#### HW\n",
+                                f"![{diff.hw_golden_url}]({diff.hw_golden_url})\n",
+                                "#### PR vs HW\n",
+                                f"[[{diff.hw_diff_url}|{diff.hw_diff_url}]]\n",
                             ]
                         )
+                    else:
+                        lines.append("#### HW\nPR matches hardware\n")
 
-                        if diff.hw_golden_url:
-                            outfile.writelines(
-                                [
-                                    "#### HW\n",
-                                    f"![{diff.hw_golden_url}]({diff.hw_golden_url})\n",
-                                    "#### PR vs HW\n",
-                                    f"[[{diff.hw_diff_url}|{diff.hw_diff_url}]]\n",
-                                ]
-                            )
-                        else:
-                            outfile.write("#### HW\nPR matches hardware\n")
-
-                        outfile.write("\n")
+                    lines.append("\n")
+
+        with open(page_filename, "w") as outfile:
+            outfile.writelines(lines)
 
         return 0
 
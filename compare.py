@@ -5,29 +5,60 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import contextlib
+import functools
 import glob
+import hashlib
 import json
 import logging
+import multiprocessing
 import os
 import re
 import shutil
+import sqlite3
 import subprocess
 import sys
-from collections import defaultdict
-from typing import NamedTuple
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, NamedTuple
 
-logger = logging.getLogger(__name__)
+from tqdm import tqdm
+from tqdm.asyncio import tqdm_asyncio
 
-_HW_GOLDEN_GIT_URL = "https://github.com/abaire/nxdk_pgraph_tests_golden_results.git"
-PERCEPTUALDIFF_DIFFERENCE_RE = re.compile(r"(\d+) pixels are different")
+if TYPE_CHECKING:
+    from collections.abc import Callable
 
+# orjson is optional, but considerably faster at serializing large comparison summaries.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-class ResultsInfo(NamedTuple):
+logger = logging.getLogger(__name__)
+
+_HW_GOLDEN_GIT_URL = "https://github.com/abaire/nxdk_pgraph_tests_golden_results.git"
+PERCEPTUALDIFF_DIFFERENCE_RE = re.compile(rb"^(\d+) pixels are different", re.MULTILINE)
+DEFAULT_LPIPS_BATCH_SIZE = 32
+# Downscaling changes the computed distances, so it is disabled unless explicitly requested.
+DEFAULT_LPIPS_SIZE = 0
+# Reduced precision LPIPS distances within this much of the diff threshold are recomputed in full precision.
+LPIPS_REDUCED_PRECISION_MARGIN = 1e-3
+# How long to wait on other processes holding the comparison ledger's lock before giving up.
+_LEDGER_TIMEOUT_SECONDS = 60
+
+
+@dataclass
+class ResultsInfo:
     result_path: str
     xemu_version: str
     platform_info: str
     gl_info: str
-    test_suites: dict[str, dict[str, str]]
+    # (test_suite, test_case, artifact_path) for every result image, sorted by suite and case.
+    rows: list[tuple[str, str, str]] = field(default_factory=list)
+    _file_digests: dict[str, bytes] = field(default_factory=dict, init=False, repr=False)
 
     @property
     def run_identifier(self):
@@ -41,33 +72,67 @@ class ResultsInfo(NamedTuple):
     def run_identifier_subdirectory(self) -> str:
         return self.run_identifier.replace(":", "__")
 
-    def get_flattened_tests(self) -> set[str]:
-        """Return a flattened set of test_suite::test_case."""
-        ret = set()
-        for suite_name, test_cases in self.test_suites.items():
-            suite_dir_name = suite_name.replace(" ", "_")
-            for test_case in test_cases:
-                ret.add(f"{suite_dir_name}:{test_case}")
-        return ret
+    @functools.cached_property
+    def flattened_tests(self) -> set[str]:
+        """Flattened set of test_suite::test_case, computed once the result images have been found."""
+        return {f"{test_suite.replace(' ', '_')}:{test_case}" for test_suite, test_case, _ in self.rows}
+
+    @functools.cached_property
+    def artifacts_by_test(self) -> dict[tuple[str, str], str]:
+        """Maps (test_suite, test_case) to the path of its image, for joining against another set of results."""
+        return {(test_suite, test_case): path for test_suite, test_case, path in self.rows}
+
+    def file_digest(self, path: str) -> bytes:
+        """Returns a content hash of the given image, computed at most once per ResultsInfo."""
+        digest = self._file_digests.get(path)
+        if digest is None:
+            with open(path, "rb", buffering=0) as infile:
+                digest = hashlib.file_digest(infile, "blake2b").digest()
+            self._file_digests[path] = digest
+        return digest
 
     def find_result_images(self) -> ResultsInfo:
         """Walks the result_path to find all png images."""
-        for root, dirnames, filenames in os.walk(self.result_path):
-            if os.path.basename(root).startswith("."):
-                dirnames.clear()
-                continue
+        rows: list[tuple[str, str, str]] = []
+        self._find_result_images(self.result_path, rows)
+        # Like the nested suite dicts this replaced, an image found later replaces any earlier one with the same name.
+        latest = {(test_suite, test_case): path for test_suite, test_case, path in rows}
+        self.rows = sorted((test_suite, test_case, path) for (test_suite, test_case), path in latest.items())
+        return self
 
-            if dirnames:
-                continue
+    def _find_result_images(self, directory: str, rows: list[tuple[str, str, str]]):
+        """Adds the files in each leaf directory under `directory` as test cases of a suite named after the leaf."""
+        basename = os.path.basename(directory)
+        if basename.startswith("."):
+            return
 
-            test_suite = os.path.basename(root)
-            if test_suite in {"perceptualdiff", "scripts"}:
-                continue
+        subdirectories: list[os.DirEntry] = []
+        filenames: list[str] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        subdirectories.append(entry)
+                    else:
+                        filenames.append(entry.name)
+        except OSError:
+            return
 
-            for filename in filenames:
-                test_case = os.path.splitext(filename)[0]
-                self.test_suites[test_suite][test_case] = os.path.join(root, filename)
-        return self
+        if subdirectories:
+            for entry in subdirectories:
+                if not entry.is_symlink():
+                    self._find_result_images(entry.path, rows)
+            return
+
+        if not filenames or basename in {"perceptualdiff", "scripts"}:
+            return
+
+        for filename in filenames:
+            rows.append((basename, os.path.splitext(filename)[0], os.path.join(directory, filename)))
 
     @classmethod
     def parse(cls, result_path: str) -> ResultsInfo:
@@ -78,7 +143,6 @@ class ResultsInfo(NamedTuple):
             xemu_version=components[-4],
             platform_info=components[-3],
             gl_info=f"{components[-2]}:{components[-1]}",
-            test_suites=defaultdict(dict),
         ).find_result_images()
 
 
@@ -99,27 +163,108 @@ class Difference(NamedTuple):
     def difference_filename(self) -> str:
         return f"{os.path.join(self.test_suite, self.test_case)}-diff.png"
 
-    def generate_difference_image(self, perceptualdiff: str, output_path: str) -> tuple[int, str, str]:
-        """Generates a diff image in the given output_path using perceptualdiff.
-
-        Returns tuple[ExitCode, STDOUT, STDERR]
-        """
+    def _perceptualdiff_command(self, perceptualdiff: str, output_path: str) -> list[str]:
         target_filename = os.path.join(output_path, self.difference_filename)
         target_dir = os.path.dirname(target_filename)
         os.makedirs(target_dir, exist_ok=True)
+        return [
+            perceptualdiff,
+            "-output",
+            target_filename,
+            self.result_artifact,
+            self.golden_artifact,
+        ]
+
+    def generate_difference_image(self, perceptualdiff: str, output_path: str) -> tuple[int, bytes, bytes]:
+        """Generates a diff image in the given output_path using perceptualdiff.
+
+        Returns tuple[ExitCode, STDOUT, STDERR], with the output left undecoded.
+        """
         result = subprocess.run(
-            [
-                perceptualdiff,
-                "-output",
-                target_filename,
-                self.result_artifact,
-                self.golden_artifact,
-            ],
+            self._perceptualdiff_command(perceptualdiff, output_path),
             check=False,
             capture_output=True,
         )
 
-        return result.returncode, result.stdout.decode(), result.stderr.decode()
+        return result.returncode, result.stdout, result.stderr
+
+    async def generate_difference_image_async(self, perceptualdiff: str, output_path: str) -> tuple[int, bytes, bytes]:
+        """Asynchronous version of generate_difference_image."""
+        process = await asyncio.create_subprocess_exec(
+            *self._perceptualdiff_command(perceptualdiff, output_path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate()
+
+        return process.returncode, stdout, stderr
+
+
+class ComparisonLedger:
+    """Persistent record of comparison results, keyed by the content hashes of the compared images.
+
+    Entries are also keyed by a `method` string that must capture anything that affects the recorded value.
+    """
+
+    def __init__(self, path: str):
+        # Lookups come from the image loading threads, so the connection is shared and access serialized.
+        # Several compare.py processes may share the ledger, so writers wait on each other rather than failing
+        # immediately and WAL lets readers proceed while another process writes.
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        try:
+            self._connection = sqlite3.connect(path, timeout=_LEDGER_TIMEOUT_SECONDS, check_same_thread=False)
+            with self._lock, self._connection:
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS comparisons ("
+                    "method TEXT NOT NULL, result_hash BLOB NOT NULL, golden_hash BLOB NOT NULL, "
+                    "distance REAL NOT NULL, PRIMARY KEY (method, result_hash, golden_hash))"
+                )
+        except sqlite3.OperationalError:
+            # The ledger is only a cache, so comparisons simply proceed without it.
+            logger.warning("Failed to open comparison ledger at %s, continuing without it", path, exc_info=True)
+            if self._connection:
+                self._connection.close()
+            self._connection = None
+
+    def get(self, method: str, result_hash: bytes, golden_hash: bytes) -> float | None:
+        """Returns the recorded distance, or None if there is none or the ledger could not be read."""
+        if not self._connection:
+            return None
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT distance FROM comparisons WHERE method = ? AND result_hash = ? AND golden_hash = ?",
+                    (method, result_hash, golden_hash),
+                ).fetchone()
+        except sqlite3.OperationalError:
+            logger.warning("Failed to read from comparison ledger", exc_info=True)
+            return None
+        return row[0] if row else None
+
+    def put_many(self, method: str, entries: list[tuple[bytes, bytes, float]]):
+        """Records (result_hash, golden_hash, distance) entries in a single transaction.
+
+        Failures are logged and otherwise ignored, as the entries will simply be recomputed next time.
+        """
+        if not entries or not self._connection:
+            return
+        try:
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO comparisons (method, result_hash, golden_hash, distance) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(method, result_hash, golden_hash, distance) for result_hash, golden_hash, distance in entries],
+                )
+        except sqlite3.OperationalError:
+            logger.warning("Failed to write %d entries to comparison ledger", len(entries), exc_info=True)
+
+    def close(self):
+        if not self._connection:
+            return
+        with self._lock:
+            self._connection.close()
 
 
 def _ensure_path(path: str) -> str:
@@ -139,86 +284,371 @@ def _fetch_hw_goldens(output_dir: str):
     from git import Repo
 
     logger.info("Cloning from %s", _HW_GOLDEN_GIT_URL)
-    Repo.clone_from(_HW_GOLDEN_GIT_URL, output_dir, depth=1)
+    # Only the results tree is used, so do a blobless partial clone and only check out (and thus fetch) that subtree.
+    repo = Repo.clone_from(
+        _HW_GOLDEN_GIT_URL, output_dir, depth=1, multi_options=["--filter=blob:none", "--sparse"]
+    )
+    repo.git.sparse_checkout("set", "results")
 
 
-def _compare_lpips(results_info: ResultsInfo, golden_info: ResultsInfo) -> tuple[set[str], set[str], list[Difference]]:
-    import lpips
+def _ensure_hw_goldens(cache_path: str) -> str:
+    """Returns the path to the Xbox hardware golden results, cloning them into the cache if necessary."""
+    hw_golden_root = os.path.join(_ensure_cache_path(cache_path), "nxdk_pgraph_tests_golden_results")
+    if not os.path.isdir(hw_golden_root):
+        _fetch_hw_goldens(hw_golden_root)
+    return os.path.join(hw_golden_root, "results")
+
 
-    loss_fn = lpips.LPIPS(net="alex")
+def _decode_image_array(path: str):
+    """Decodes the given image into a uint8 CHW RGB numpy array."""
+    try:
+        from torchvision.io import ImageReadMode, decode_image, read_file
+    except ImportError:
+        # Without torchvision, fall back to lpips.load_image, which decodes PNGs to an HWC RGB array via OpenCV.
+        import lpips
+        import numpy as np
 
-    results_tests = results_info.get_flattened_tests()
-    golden_tests = golden_info.get_flattened_tests()
+        return np.ascontiguousarray(lpips.load_image(path).transpose(2, 0, 1))
+
+    # Decoding straight to a uint8 CHW tensor avoids the intermediate copies made by lpips.im2tensor.
+    return decode_image(read_file(path), mode=ImageReadMode.RGB).numpy()
+
+
+def _init_decoder_process():
+    import torch
+
+    # Each decoder process handles a single image at a time, so intra-op threads would just oversubscribe the cores.
+    torch.set_num_threads(1)
+
+
+def _decode_lpips_image(path: str, decoder: ProcessPoolExecutor | None = None):
+    """Decodes the given image into an LPIPS input tensor, matching `lpips.im2tensor(lpips.load_image(path))`.
+
+    If `decoder` is given, the decode itself runs in one of its processes rather than in the calling thread.
+    """
+    import torch
+
+    image = decoder.submit(_decode_image_array, path).result() if decoder else _decode_image_array(path)
+    return (torch.from_numpy(image).float() / 127.5 - 1.0).unsqueeze(0)
+
+
+def _load_lpips_tensor(path: str, tensor_cache_dir: str | None = None, decoder: ProcessPoolExecutor | None = None):
+    """Loads the given image as an LPIPS input tensor.
+
+    If `tensor_cache_dir` is given, the decoded tensor is persisted there, keyed by the image's path, size, and
+    modification time, so later runs against unchanged images skip decoding entirely.
+    """
+    if not tensor_cache_dir:
+        return _decode_lpips_image(path, decoder)
+
+    import torch
+
+    stat = os.stat(path)
+    key = hashlib.sha1(
+        f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode(), usedforsecurity=False
+    ).hexdigest()
+    cache_file = os.path.join(tensor_cache_dir, key[:2], key[2:4], f"{key}.pt")
+    if os.path.isfile(cache_file):
+        try:
+            return torch.load(cache_file, map_location="cpu", mmap=True)
+        except (OSError, RuntimeError):
+            logger.warning("Ignoring unreadable cached tensor %s for %s", cache_file, path)
+
+    tensor = _decode_lpips_image(path, decoder)
+
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    # Several compare.py processes may populate the same cache, so the temp name must be unique across processes.
+    temp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    torch.save(tensor, temp_file)
+    os.replace(temp_file, cache_file)
+    return tensor
+
+
+def _select_torch_device() -> str:
+    """Returns the best available torch device for running LPIPS."""
+    import torch
+
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def _downscale_lpips_batch(batch, max_size: int):
+    """Downscales the given NCHW batch so its longest side is at most `max_size`, preserving the aspect ratio."""
+    height, width = batch.shape[-2:]
+    if not max_size or max(height, width) <= max_size:
+        return batch
+
+    from torch.nn import functional
+
+    scale = max_size / max(height, width)
+    size = (max(1, round(height * scale)), max(1, round(width * scale)))
+    # Antialiasing blends every source pixel into the output, so small differences are attenuated rather than skipped.
+    return functional.interpolate(batch, size=size, mode="bilinear", align_corners=False, antialias=True)
+
+
+@functools.cache
+def _load_lpips_model(device: str, *, compile_model: bool = False):
+    """Returns the LPIPS model on the given device, loaded (and optionally compiled) once per process."""
+    import lpips
+    import torch
+
+    loss_fn = lpips.LPIPS(net="alex").to(device).eval()
+    if compile_model:
+        # Batch and image sizes vary between comparisons, so the graph is compiled with dynamic shapes rather than
+        # specialized and recompiled for each one.
+        mode = "reduce-overhead" if device == "cuda" else "default"
+        loss_fn = torch.compile(loss_fn, mode=mode, dynamic=True)
+    return loss_fn
+
+
+def _compare_lpips(
+    results_info: ResultsInfo,
+    golden_info: ResultsInfo,
+    batch_size: int = DEFAULT_LPIPS_BATCH_SIZE,
+    tensor_cache_dir: str | None = None,
+    *,
+    compile_model: bool = False,
+    max_size: int = DEFAULT_LPIPS_SIZE,
+    decode_processes: int = 0,
+    ledger: ComparisonLedger | None = None,
+    on_difference: Callable[[Difference], None] | None = None,
+    reduced_precision_threshold: float | None = None,
+    cpu_bf16: bool = False,
+    jobs: int | None = None,
+) -> tuple[set[str], set[str], list[Difference]]:
+    """Computes the LPIPS distance of every result with a matching golden.
+
+    If `on_difference` is given, it is called with each Difference as soon as its distance is known.
+
+    Reduced precision is only used if `reduced_precision_threshold` is given, in which case any distance that lands
+    within LPIPS_REDUCED_PRECISION_MARGIN of that threshold is recomputed in full precision. CUDA evaluation then runs
+    under float16 autocast, as does CPU evaluation under bfloat16 autocast if `cpu_bf16` is set.
+    """
+    import torch
+
+    device = _select_torch_device()
+    logger.debug("Running LPIPS on %s", device)
+    loss_fn = _load_lpips_model(device, compile_model=compile_model)
+    precision_name = "fp32"
+    if reduced_precision_threshold is not None:
+        if device == "cuda":
+            precision_name = "fp16"
+        elif device == "cpu" and cpu_bf16:
+            precision_name = "bf16"
+    reduced_precision = precision_name != "fp32"
+    ledger_method = f"lpips:alex:{max_size}:{device}:{precision_name}"
+
+    results_tests = results_info.flattened_tests
+    golden_tests = golden_info.flattened_tests
 
     only_results = results_tests - golden_tests
     only_goldens = golden_tests - results_tests
 
     differences: list[Difference] = []
 
+    def add_difference(diff: Difference):
+        differences.append(diff)
+        if on_difference:
+            on_difference(diff)
+
+    def process_batch(batch: list[tuple[Difference, torch.Tensor, torch.Tensor]]):
+        artifact_batch = torch.cat([artifact_image for _, artifact_image, _ in batch])
+        golden_batch = torch.cat([golden_image for _, _, golden_image in batch])
+
+        # Pinned host memory lets the copies to CUDA overlap with compute.
+        if device == "cuda":
+            artifact_batch = artifact_batch.pin_memory()
+            golden_batch = golden_batch.pin_memory()
+
+        # Half precision is only a win on CUDA. bfloat16 roughly doubles convolution throughput on CPUs with native
+        # support (AVX512-BF16/AMX).
+        if precision_name == "fp16":
+            precision = torch.autocast(device_type=device, dtype=torch.float16)
+        elif precision_name == "bf16":
+            precision = torch.autocast(device_type=device, dtype=torch.bfloat16)
+        else:
+            precision = contextlib.nullcontext()
+
+        # Nothing is ever backpropagated, so skip autograd's activation retention and version tracking entirely.
+        with torch.inference_mode():
+            # Resizing happens on the evaluation device, where it is cheapest.
+            artifact_batch = _downscale_lpips_batch(artifact_batch.to(device, non_blocking=True), max_size)
+            golden_batch = _downscale_lpips_batch(golden_batch.to(device, non_blocking=True), max_size)
+            with precision:
+                distance_values = loss_fn(artifact_batch, golden_batch).view(-1).tolist()
+
+            if reduced_precision:
+                borderline = [
+                    index
+                    for index, distance_value in enumerate(distance_values)
+                    if abs(distance_value - reduced_precision_threshold) <= LPIPS_REDUCED_PRECISION_MARGIN
+                ]
+                if borderline:
+                    indices = torch.tensor(borderline, device=device)
+                    exact_distances = loss_fn(artifact_batch[indices], golden_batch[indices]).view(-1).tolist()
+                    for index, distance_value in zip(borderline, exact_distances):
+                        distance_values[index] = distance_value
+
+        ledger_entries: list[tuple[bytes, bytes, float]] = []
+        for (diff, _, _), distance_value in zip(batch, distance_values):
+            logger.debug(
+                "LPIPS distance between %s and %s = %G",
+                diff.result_artifact,
+                diff.golden_artifact,
+                distance_value,
+            )
+            add_difference(diff._replace(distance=distance_value))
+            ledger_entries.append(
+                (
+                    results_info.file_digest(diff.result_artifact),
+                    golden_info.file_digest(diff.golden_artifact),
+                    distance_value,
+                )
+            )
+
+        if ledger:
+            ledger.put_many(ledger_method, ledger_entries)
+
+    # Only images with identical dimensions can be stacked into a single batch, so pending pairs are grouped by shape.
+    pending_batches: dict[tuple, list[tuple[Difference, torch.Tensor, torch.Tensor]]] = defaultdict(list)
+
+    def add_to_batch(diff: Difference, images: Future):
+        loaded = images.result()
+        if isinstance(loaded, float):
+            add_difference(diff._replace(distance=loaded))
+            return
+
+        artifact_image, golden_image = loaded
+        batch = pending_batches[(artifact_image.shape, golden_image.shape)]
+        batch.append((diff, artifact_image, golden_image))
+        if len(batch) >= batch_size:
+            process_batch(batch)
+            batch.clear()
+
+    def load_images(artifact: str, golden_artifact: str) -> tuple[torch.Tensor, torch.Tensor] | float:
+        """Returns the decoded image pair, or their distance if it is already known without evaluation."""
+        artifact_digest = results_info.file_digest(artifact)
+        golden_digest = golden_info.file_digest(golden_artifact)
+        # Byte-identical images trivially have a distance of 0, so they skip decoding and evaluation entirely.
+        if artifact_digest == golden_digest:
+            return 0.0
+        if ledger:
+            distance = ledger.get(ledger_method, artifact_digest, golden_digest)
+            if distance is not None:
+                return distance
+
+        # Goldens rarely change between runs, so only they are worth persisting.
+        return (
+            _load_lpips_tensor(artifact, decoder=decoder),
+            _load_lpips_tensor(golden_artifact, tensor_cache_dir, decoder),
+        )
+
+    # Images are decoded on worker threads a couple of batches ahead of the LPIPS evaluation. For very large runs the
+    # decoding itself can be moved into separate processes so that it never contends with evaluation for the GIL.
+    prefetch_depth = 2 * batch_size
+    loading: deque[tuple[Difference, Future]] = deque()
+    decoder_pool = (
+        ProcessPoolExecutor(
+            max_workers=decode_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_decoder_process,
+        )
+        if decode_processes
+        else contextlib.nullcontext()
+    )
+
     logger.info("Comparing image files (this may take some time)...")
-    for test_suite in sorted(results_info.test_suites.keys()):
-        print(test_suite)
-        test_cases = results_info.test_suites[test_suite]
-        golden_suite = golden_info.test_suites.get(test_suite, {})
-        for test_case, artifact in test_cases.items():
-            print(".", end="", flush=True)
-            golden_artifact = golden_suite.get(test_case)
+    with decoder_pool as decoder, ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        golden_artifacts = golden_info.artifacts_by_test
+        for test_suite, test_case, artifact in tqdm(results_info.rows, leave=False):
+            golden_artifact = golden_artifacts.get((test_suite, test_case))
             if not golden_artifact:
                 continue
 
-            # Load images
-            artifact_image = lpips.im2tensor(lpips.load_image(artifact))
-            golden_image = lpips.im2tensor(lpips.load_image(golden_artifact))
-
-            distance = loss_fn(artifact_image, golden_image)
-            distance_value = distance.item()
-            logger.debug(
-                "LPIPS distance between %s and %s = %G",
-                artifact,
-                golden_artifact,
-                distance_value,
+            loading.append(
+                (
+                    Difference(test_suite, test_case, artifact, golden_artifact, -1),
+                    executor.submit(load_images, artifact, golden_artifact),
+                )
             )
+            if len(loading) > prefetch_depth:
+                add_to_batch(*loading.popleft())
+
+        while loading:
+            add_to_batch(*loading.popleft())
 
-            differences.append(Difference(test_suite, test_case, artifact, golden_artifact, distance_value))
-        print("")
+    for batch in pending_batches.values():
+        if batch:
+            process_batch(batch)
 
     return only_results, only_goldens, differences
 
 
 def _compare_perceptualdiff(
-    results_info: ResultsInfo, golden_info: ResultsInfo, perceptualdiff: str, comparison_output_directory: str
+    results_info: ResultsInfo,
+    golden_info: ResultsInfo,
+    perceptualdiff: str,
+    comparison_output_directory: str,
+    ledger: ComparisonLedger | None = None,
+    jobs: int | None = None,
 ) -> tuple[set[str], set[str], list[Difference]]:
-    results_tests = results_info.get_flattened_tests()
-    golden_tests = golden_info.get_flattened_tests()
+    results_tests = results_info.flattened_tests
+    golden_tests = golden_info.flattened_tests
 
     only_results = results_tests - golden_tests
     only_goldens = golden_tests - results_tests
 
-    differences: list[Difference] = []
+    ledger_method = f"perceptualdiff:{perceptualdiff}"
+    candidates: list[Difference] = []
     logger.info("Comparing image files (this may take some time)...")
-    for test_suite in sorted(results_info.test_suites.keys()):
-        print(test_suite)
-        test_cases = results_info.test_suites[test_suite]
-        golden_suite = golden_info.test_suites.get(test_suite, {})
-        for test_case, artifact in test_cases.items():
-            print(".", end="", flush=True)
-            golden_artifact = golden_suite.get(test_case)
-            if not golden_artifact:
-                continue
+    golden_artifacts = golden_info.artifacts_by_test
+    for test_suite, test_case, artifact in results_info.rows:
+        golden_artifact = golden_artifacts.get((test_suite, test_case))
+        if not golden_artifact:
+            continue
+
+        # Differing pairs must always be rerun to produce their diff image, but known passes can be skipped outright.
+        artifact_digest = results_info.file_digest(artifact)
+        golden_digest = golden_info.file_digest(golden_artifact)
+        if artifact_digest == golden_digest:
+            continue
+        if ledger and ledger.get(ledger_method, artifact_digest, golden_digest) == 0:
+            continue
+
+        candidates.append(Difference(test_suite, test_case, artifact, golden_artifact, -1))
+
+    async def compare(diff: Difference, semaphore: asyncio.Semaphore) -> Difference | None:
+        async with semaphore:
+            result, stdout, _stderr = await diff.generate_difference_image_async(
+                perceptualdiff, comparison_output_directory
+            )
+        if not result:
+            return None
 
-            diff = Difference(test_suite, test_case, artifact, golden_artifact, -1)
-            result, stdout, stderr = diff.generate_difference_image(perceptualdiff, comparison_output_directory)
-            if not result:
-                continue
+        match = PERCEPTUALDIFF_DIFFERENCE_RE.search(stdout)
+        return diff._replace(distance=int(match.group(1)) if match else -1)
+
+    async def compare_all() -> list[Difference | None]:
+        # Each comparison runs in its own perceptualdiff process, so a single event loop can keep every core busy
+        # without tying up a thread per child.
+        semaphore = asyncio.Semaphore(jobs or os.cpu_count() or 1)
+        return await tqdm_asyncio.gather(*(compare(diff, semaphore) for diff in candidates), leave=False)
 
-            diff_score = -1
-            for line in stdout.split("\n"):
-                match = PERCEPTUALDIFF_DIFFERENCE_RE.match(line)
-                if match:
-                    diff_score = match.group(1)
-            diff = Difference(test_suite, test_case, artifact, golden_artifact, diff_score)
-            differences.append(diff)
-        print("")
+    results = asyncio.run(compare_all())
+    differences = [diff for diff in results if diff]
+
+    if ledger:
+        ledger.put_many(
+            ledger_method,
+            [
+                (results_info.file_digest(diff.result_artifact), golden_info.file_digest(diff.golden_artifact), 0)
+                for diff, result in zip(candidates, results)
+                if not result
+            ],
+        )
 
     return only_results, only_goldens, differences
 
@@ -231,7 +661,21 @@ def perform_comparison(
     diff_threshold: float,
     *,
     use_lpips: bool = True,
+    lpips_batch_size: int = DEFAULT_LPIPS_BATCH_SIZE,
+    lpips_tensor_cache_dir: str | None = None,
+    lpips_compile: bool = False,
+    lpips_size: int = DEFAULT_LPIPS_SIZE,
+    lpips_decode_processes: int = 0,
+    ledger: ComparisonLedger | None = None,
+    clean: bool = False,
+    lpips_cpu_bf16: bool = False,
+    jobs: int | None = None,
 ) -> None:
+    """Compares the results at `results_path` against those at `golden_path`.
+
+    `jobs` limits the number of concurrent perceptualdiff processes and image loading threads, defaulting to the
+    number of CPUs. Callers that run several comparisons in parallel should divide the CPUs between them.
+    """
     results_info = ResultsInfo.parse(results_path)
 
     if "nxdk_pgraph_tests_golden_results" in golden_path:
@@ -240,7 +684,6 @@ def perform_comparison(
             platform_info="Xbox",
             gl_info="DirectX:nv2a",
             result_path=golden_path,
-            test_suites=defaultdict(dict),
         ).find_result_images()
         against_name = "Xbox_Hardware"
     else:
@@ -254,31 +697,60 @@ def perform_comparison(
         results_info.output_subdirectory,
         golden_info.run_identifier_subdirectory,
     )
-    if os.path.isdir(comparison_output_directory):
+    # Outputs from a previous run are overwritten in place and only the stale leftovers are removed afterwards, which
+    # is far cheaper than deleting and recreating the whole tree.
+    if clean and os.path.isdir(comparison_output_directory):
         shutil.rmtree(comparison_output_directory)
     os.makedirs(comparison_output_directory, exist_ok=True)
 
     if use_lpips:
-        only_results, only_golden, diffs = _compare_lpips(results_info, golden_info)
+        # Diff images are generated as soon as each distance is known, overlapping with the remaining LPIPS batches.
+        diff_image_futures: dict[str, Future] = {}
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+
+            def generate_difference_image(diff: Difference):
+                if diff.distance < diff_threshold:
+                    logger.info(
+                        "Not generating diff image for %s with distance %G below threshold",
+                        diff.fully_qualified_test_name,
+                        diff.distance,
+                    )
+                    return
+                logger.info("Generating diff image for %s", diff.fully_qualified_test_name)
+                diff_image_futures[diff.difference_filename] = executor.submit(
+                    diff.generate_difference_image, perceptualdiff, comparison_output_directory
+                )
+
+            only_results, only_golden, diffs = _compare_lpips(
+                results_info,
+                golden_info,
+                lpips_batch_size,
+                lpips_tensor_cache_dir,
+                compile_model=lpips_compile,
+                max_size=lpips_size,
+                decode_processes=lpips_decode_processes,
+                ledger=ledger,
+                on_difference=generate_difference_image,
+                reduced_precision_threshold=diff_threshold,
+                cpu_bf16=lpips_cpu_bf16,
+                jobs=jobs,
+            )
+
+        for future in diff_image_futures.values():
+            future.result()
+
         if not (only_results or only_golden or diffs):
+            _remove_stale_outputs(comparison_output_directory, set())
             return
-
-        for diff in sorted(diffs, key=lambda x: f"{x.test_suite}:{x.test_case}"):
-            if diff.distance < diff_threshold:
-                logger.info(
-                    "Not generating diff image for %s with distance %G below threshold",
-                    diff.fully_qualified_test_name,
-                    diff.distance,
-                )
-                continue
-            logger.info("Generating diff image for %s", diff.fully_qualified_test_name)
-            diff.generate_difference_image(perceptualdiff, comparison_output_directory)
+        generated = set(diff_image_futures)
     else:
         only_results, only_golden, diffs = _compare_perceptualdiff(
-            results_info, golden_info, perceptualdiff, comparison_output_directory
+            results_info, golden_info, perceptualdiff, comparison_output_directory, ledger, jobs
         )
         if not (only_results or only_golden or diffs):
+            _remove_stale_outputs(comparison_output_directory, set())
             return
+        generated = {diff.difference_filename for diff in diffs}
 
     logger.debug("Writing output to %s", comparison_output_directory)
 
@@ -289,8 +761,35 @@ def perform_comparison(
         "goldens_without_results": sorted(only_golden),
         "tests_with_differences": {diff.fully_qualified_test_name: diff.distance for diff in diffs},
     }
-    with open(os.path.join(comparison_output_directory, "summary.json"), "w", encoding="utf-8") as outfile:
-        json.dump(summary, outfile, ensure_ascii=True, indent=2, sort_keys=True)
+    summary_file = os.path.join(comparison_output_directory, "summary.json")
+    if orjson:
+        with open(summary_file, "wb") as outfile:
+            outfile.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+    else:
+        with open(summary_file, "w", encoding="utf-8") as outfile:
+            json.dump(summary, outfile, ensure_ascii=True, indent=2, sort_keys=True)
+
+    _remove_stale_outputs(comparison_output_directory, {*generated, "summary.json"})
+
+
+def _remove_stale_outputs(directory: str, keep: set[str], prefix: str = "") -> bool:
+    """Deletes files under `directory` whose relative paths are not in `keep`, pruning any emptied subdirectories.
+
+    Returns True if `directory` was left empty.
+    """
+    empty = True
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            relative_path = os.path.join(prefix, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                if _remove_stale_outputs(entry.path, keep, relative_path):
+                    os.rmdir(entry.path)
+                    continue
+            elif relative_path not in keep:
+                os.unlink(entry.path)
+                continue
+            empty = False
+    return empty
 
 
 def _discover_results(results_root: str) -> list[str]:
@@ -309,8 +808,15 @@ def _process_arguments_and_run():
     )
     parser.add_argument(
         "results",
+        nargs="?",
         help="Path to the root of the results to compare against the golden results.",
     )
+    parser.add_argument(
+        "--manifest",
+        metavar="path_to_manifest",
+        help="Path to a JSON file containing a list of [results, against] pairs to compare. An `against` of null "
+        "compares against the HW results repo.",
+    )
     parser.add_argument("--list", action="store_true", help="List likely test result sets in the <results> directory.")
     parser.add_argument(
         "--output-dir",
@@ -342,11 +848,66 @@ def _process_arguments_and_run():
         action="store_true",
         help="Use LPIPS to pre-filter diffs before perceptualdiff.",
     )
+    parser.add_argument(
+        "--lpips-batch-size",
+        type=int,
+        default=DEFAULT_LPIPS_BATCH_SIZE,
+        help="Maximum number of image pairs evaluated together in a single LPIPS pass.",
+    )
+    parser.add_argument(
+        "--lpips-compile",
+        action="store_true",
+        help="Compile the LPIPS model with torch.compile. Adds a fixed startup cost, so only worthwhile for large runs.",
+    )
+    parser.add_argument(
+        "--lpips-size",
+        type=int,
+        default=DEFAULT_LPIPS_SIZE,
+        help="Images whose longest side exceeds this are downscaled to it before LPIPS evaluation. Trades accuracy for "
+        "speed, as distances are no longer comparable to those of full size images. 0 (the default) disables.",
+    )
+    parser.add_argument(
+        "--lpips-decode-processes",
+        type=int,
+        default=0,
+        help="Number of processes used to decode images for LPIPS. 0 decodes on threads within the main process.",
+    )
+    parser.add_argument(
+        "--lpips-cpu-bf16",
+        action="store_true",
+        help="Evaluate LPIPS in bfloat16 when running on the CPU. Distances close to the diff threshold are rechecked "
+        "in full precision.",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Maximum number of concurrent perceptualdiff processes and image loading threads. Defaults to the number "
+        "of CPUs; reduce this when running several instances of this script in parallel.",
+    )
+    parser.add_argument(
+        "--no-ledger",
+        action="store_true",
+        help="Do not reuse (or record) comparison results cached from previous runs against identical images.",
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="Delete each comparison output directory up front instead of only removing stale files afterwards.",
+    )
 
     args = parser.parse_args()
 
+    if args.manifest:
+        with open(args.manifest) as infile:
+            comparisons = [(results, against) for results, against in json.load(infile)]
+    elif args.results:
+        comparisons = [(args.results, args.against)]
+    else:
+        parser.error("one of results or --manifest is required")
+
     if args.list:
-        local_results = _discover_results(args.results)
+        local_results = [result for results, _ in comparisons for result in _discover_results(results)]
         print("Discovered test runs:")
         if not local_results:
             print("  None")
@@ -358,30 +919,56 @@ def _process_arguments_and_run():
     log_level = logging.DEBUG if args.verbose else logging.INFO
     logging.basicConfig(level=log_level)
 
-    if not os.path.isdir(args.results):
-        logger.error("Source directory '%s' does not exist", args.results)
-        return 1
-
-    if not args.against:
-        cache_path = _ensure_cache_path(args.cache_path)
-        hw_golden_root = os.path.join(cache_path, "nxdk_pgraph_tests_golden_results")
-        if not os.path.isdir(hw_golden_root):
-            _fetch_hw_goldens(hw_golden_root)
-        golden_dir = os.path.join(hw_golden_root, "results")
-    else:
-        golden_dir = args.against
-
-    if not os.path.isdir(golden_dir):
-        logger.error("Comparison directory '%s' does not exist", golden_dir)
-        return 1
-
-    os.makedirs(args.output_dir, exist_ok=True)
+    ret = 0
+    hw_golden_dir = None
+    lpips_tensor_cache_dir = None
+    if args.use_lpips:
+        lpips_tensor_cache_dir = os.path.join(_ensure_cache_path(args.cache_path), "lpips_tensors")
+    ledger = None
+    if not args.no_ledger:
+        ledger = ComparisonLedger(os.path.join(_ensure_cache_path(args.cache_path), "comparisons.db"))
+    for results, against in comparisons:
+        if not os.path.isdir(results):
+            logger.error("Source directory '%s' does not exist", results)
+            ret = 1
+            continue
+
+        if against:
+            golden_dir = against
+        else:
+            if not hw_golden_dir:
+                hw_golden_dir = _ensure_hw_goldens(args.cache_path)
+            golden_dir = hw_golden_dir
+
+        if not os.path.isdir(golden_dir):
+            logger.error("Comparison directory '%s' does not exist", golden_dir)
+            ret = 1
+            continue
+
+        os.makedirs(args.output_dir, exist_ok=True)
+
+        perform_comparison(
+            results,
+            golden_dir,
+            args.output_dir,
+            args.perceptualdiff,
+            args.diff_threshold,
+            use_lpips=args.use_lpips,
+            lpips_batch_size=args.lpips_batch_size,
+            lpips_tensor_cache_dir=lpips_tensor_cache_dir,
+            lpips_compile=args.lpips_compile,
+            lpips_size=args.lpips_size,
+            lpips_decode_processes=args.lpips_decode_processes,
+            lpips_cpu_bf16=args.lpips_cpu_bf16,
+            ledger=ledger,
+            clean=args.clean,
+            jobs=args.jobs,
+        )
 
-    perform_comparison(
-        args.results, golden_dir, args.output_dir, args.perceptualdiff, args.diff_threshold, use_lpips=args.use_lpips
-    )
+    if ledger:
+        ledger.close()
 
-    return 0
+    return ret
 
 
 if __name__ == "__main__":
@@ -6,19 +6,25 @@ from __future__ import annotations
 
 import argparse
 import contextlib
+import hashlib
 import json
 import logging
+import mmap
 import os
 import platform
+import re
 import shutil
+import signal
+import struct
 import subprocess
 import sys
 import tempfile
+import threading
+import time
 import zipfile
-from shutil import SameFileError
+from concurrent.futures import ThreadPoolExecutor
 from time import sleep
 from typing import Any
-from urllib.request import urlcleanup, urlretrieve
 
 import nxdk_pgraph_test_runner
 import requests
@@ -26,25 +32,210 @@ from nxdk_pgraph_test_runner import Config
 from nxdk_pgraph_test_runner.emulator_output import EmulatorOutput
 from nxdk_pgraph_test_runner.host_profile import HostProfile
 from nxdk_pgraph_test_runner.runner import get_output_directory
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+# isal is optional, but inflates DEFLATE streams considerably faster than the stdlib zlib.
+try:
+    from isal import isal_zlib
+except ImportError:
+    isal_zlib = None
+
+# ijson is optional, but lets GitHub release listings be parsed incrementally without materializing every field.
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# GitHub API responses cached within the cache directory, keyed by URL, for revalidation via conditional requests.
+_GITHUB_API_CACHE_FILENAME = "github_api_cache.json"
+
+# Maps GitHub releases to the artifacts previously downloaded for them into the cache directory.
+_RESOLVED_ARTIFACTS_FILENAME = "resolved.json"
+
+# Maps emulator binaries to the version info they report, so they need not be launched just to determine it.
+_EMULATOR_VERSIONS_FILENAME = "emulator_versions.json"
+
+# How long an artifact resolved for the "latest" release is reused before GitHub is asked about newer releases.
+_LATEST_RELEASE_TTL_SECONDS = int(os.environ.get("PGRAPH_LATEST_RELEASE_TTL_SECONDS", 60 * 60))
+
+# Serializes updates to the JSON cache files, which are shared by the concurrent download threads.
+_CACHE_FILE_LOCK = threading.Lock()
+
+_SYSTEM = platform.system()
+_MACHINE = platform.machine()
+
+# Matches the name of the xemu release asset for the current platform.
+if _SYSTEM == "Linux":
+    # xemu-v0.8.15-x86_64.AppImage
+    _XEMU_ASSET_RE = re.compile(rf"xemu-v(?!.*-dbg-).*{re.escape(_MACHINE)}.*\.AppImage")
+elif _SYSTEM == "Darwin":
+    # xemu-macos-universal-release.zip
+    _XEMU_ASSET_RE = re.compile(r"xemu-macos-universal-release\.zip")
+elif _SYSTEM == "Windows":
+    # xemu-win-x86_64-release.zip
+    _XEMU_ASSET_RE = re.compile(
+        rf"xemu-win-.*{re.escape('x86_64' if _MACHINE == 'AMD64' else _MACHINE.lower())}.*release\.zip"
+    )
+else:
+    _XEMU_ASSET_RE = None
+
+_PGRAPH_TESTS_API_URL = "https://api.github.com/repos/abaire/nxdk_pgraph_tests"
+_XEMU_API_URL = "https://api.github.com/repos/xemu-project/xemu"
+_XEMU_HDD_API_URL = "https://api.github.com/repos/xemu-project/xemu-hdd-image"
+
+
+def _create_session() -> requests.Session:
+    """Creates a Session that keeps connections to GitHub alive across requests."""
+    session = requests.Session()
+    session.headers.update(
+        {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+    )
+    github_token = os.environ.get("GITHUB_TOKEN")
+    if github_token:
+        session.headers["Authorization"] = f"Bearer {github_token}"
+
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
+    return session
 
-def _fetch_github_release_info(api_url: str, tag: str = "latest") -> dict[str, Any] | None:
-    full_url = f"{api_url}/releases/latest" if not tag or tag == "latest" else f"{api_url}/releases"
 
-    def fetch_and_filter(url: str):
+_SESSION = _create_session()
+
+
+def _load_cache_file(cache_file: str) -> dict[str, Any]:
+    with contextlib.suppress(OSError, ValueError), open(cache_file) as infile:
+        return json.load(infile)
+    return {}
+
+
+def _update_cache_file(cache_file: str, key: str, entry: dict[str, Any]) -> None:
+    """Atomically sets `key` to `entry` in the given JSON cache file."""
+    with _CACHE_FILE_LOCK:
+        cache = _load_cache_file(cache_file)
+        cache[key] = entry
+        temp_file = f"{cache_file}.tmp"
+        with open(temp_file, "w") as outfile:
+            json.dump(cache, outfile)
+        os.replace(temp_file, cache_file)
+
+
+def _resolve_cached(api_url: str, tag: str, cache_dir: str) -> str | None:
+    """Returns the artifact previously downloaded for the given release, if it may be reused without asking GitHub."""
+    entry = _load_cache_file(os.path.join(cache_dir, _RESOLVED_ARTIFACTS_FILENAME)).get(f"{api_url}@{tag or 'latest'}")
+    if not entry or not os.path.exists(entry["path"]):
+        return None
+
+    if (not tag or tag == "latest") and time.time() - entry["resolved_at"] > _LATEST_RELEASE_TTL_SECONDS:
+        return None
+
+    if not _has_valid_digest(entry["path"], quick=True):
+        return None
+
+    logger.debug("Using %s previously resolved for %s at release tag %s", entry["path"], api_url, tag)
+    return entry["path"]
+
+
+def _record_resolved(api_url: str, tag: str, cache_dir: str, path: str) -> None:
+    _update_cache_file(
+        os.path.join(cache_dir, _RESOLVED_ARTIFACTS_FILENAME),
+        f"{api_url}@{tag or 'latest'}",
+        {"path": path, "resolved_at": time.time()},
+    )
+
+
+def _parse_release_stream(stream: Any) -> dict[str, Any] | list[dict[str, Any]] | None:
+    """Incrementally parses a GitHub release, or list of releases, keeping only the fields used by this script."""
+    releases: list[dict[str, Any]] = []
+    is_list = False
+    for prefix, event, value in ijson.parse(stream):
+        if not prefix:
+            if event == "start_array":
+                is_list = True
+            elif event == "start_map":
+                releases.append({"assets": []})
+            continue
+
+        if is_list:
+            if prefix == "item":
+                if event == "start_map":
+                    releases.append({"assets": []})
+                continue
+            # Strip the leading "item." so that list entries are handled like a single release.
+            prefix = prefix[5:]
+
+        if prefix == "tag_name":
+            releases[-1]["tag_name"] = value
+        elif prefix == "assets.item":
+            if event == "start_map":
+                releases[-1]["assets"].append({})
+        elif prefix in {"assets.item.name", "assets.item.browser_download_url", "assets.item.digest"}:
+            releases[-1]["assets"][-1][prefix[12:]] = value
+
+    if is_list:
+        return releases
+    return releases[0] if releases else None
+
+
+def _fetch_github_json(url: str, cache_dir: str | None = None) -> tuple[Any, str | None]:
+    """Fetches the JSON body at the given GitHub API URL, along with the URL of the next page of results, if any.
+
+    If `cache_dir` is given, responses are cached there and revalidated with conditional requests, so unchanged
+    responses are served from disk without transferring the body or counting against the API rate limit.
+
+    If ijson is available, the body is parsed incrementally and reduced to the release fields used by this script.
+    """
+    cache_file = os.path.join(cache_dir, _GITHUB_API_CACHE_FILENAME) if cache_dir else None
+    cached = _load_cache_file(cache_file).get(url) if cache_file else None
+
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    with _SESSION.get(url, headers=headers, timeout=15, stream=True) as response:
+        if cached and response.status_code == requests.codes.not_modified:
+            return cached["body"], cached.get("next")
+        response.raise_for_status()
+        if ijson:
+            response.raw.decode_content = True
+            body = _parse_release_stream(response.raw)
+        else:
+            body = response.json()
+    next_url = response.links.get("next", {}).get("url")
+
+    if cache_file and (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+        _update_cache_file(
+            cache_file,
+            url,
+            {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "next": next_url,
+                "body": body,
+            },
+        )
+
+    return body, next_url
+
+
+def _fetch_github_release_info(
+    api_url: str, tag: str = "latest", cache_dir: str | None = None
+) -> dict[str, Any] | None:
+    url = f"{api_url}/releases/latest" if not tag or tag == "latest" else f"{api_url}/releases?per_page=100"
+
+    while url:
         try:
-            response = requests.get(
-                url,
-                headers={
-                    "Accept": "application/vnd.github+json",
-                    "X-GitHub-Api-Version": "2022-11-28",
-                },
-                timeout=15,
-            )
-            response.raise_for_status()
-            release_info = response.json()
+            release_info, next_url = _fetch_github_json(url, cache_dir)
 
         except requests.exceptions.RequestException:
             logger.exception("Failed to retrieve information from %s", url)
@@ -55,24 +246,62 @@ def _fetch_github_release_info(api_url: str, tag: str = "latest") -> dict[str, A
         if release_info:
             return release_info
 
-        if not response.links:
-            return None
+        # GitHub carries per_page over into the next link.
+        url = next_url
+
+    return None
 
-        next_link = response.links.get("next", {}).get("url")
-        if not next_link:
-            return None
-        next_link = next_link + "&per_page=60"
-        return fetch_and_filter(next_link)
 
-    return fetch_and_filter(full_url)
+def _record_digest(path: str, digest: str) -> None:
+    """Records the SHA256 digest of the given downloaded file, along with its size and modification time."""
+    stat = os.stat(path)
+    with open(f"{path}.sha256", "w") as outfile:
+        json.dump({"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}, outfile)
 
 
-def _download_artifact(target_path: str, download_url: str, artifact_path_override: str | None = None) -> bool:
-    """Downloads an artifact from the given URL, if it does not already exist. Returns True if download was needed."""
-    if os.path.exists(target_path):
+def _has_valid_digest(path: str, *, quick: bool = False) -> bool:
+    """Checks `path` against the SHA256 digest recorded when it was downloaded, discarding it if they do not match.
+
+    Files without a recorded digest are assumed to be valid. If `quick` is set, files whose size and modification time
+    are unchanged since they were downloaded are assumed to be valid without rehashing them.
+    """
+    digest_file = f"{path}.sha256"
+    try:
+        with open(digest_file) as infile:
+            recorded = json.load(infile)
+    except (FileNotFoundError, ValueError):
+        return True
+
+    stat = os.stat(path)
+    if stat.st_size == recorded.get("size"):
+        if quick and stat.st_mtime_ns == recorded.get("mtime_ns"):
+            return True
+        with open(path, "rb") as infile:
+            if hashlib.file_digest(infile, "sha256").hexdigest() == recorded.get("sha256"):
+                return True
+
+    logger.warning("%s does not match its recorded SHA256 digest and will be downloaded again", path)
+    os.remove(path)
+    os.remove(digest_file)
+    return False
+
+
+def _download_artifact(
+    target_path: str, download_url: str, artifact_path_override: str | None = None, digest: str | None = None
+) -> bool:
+    """Downloads an artifact from the given URL, if it does not already exist. Returns True if download was needed.
+
+    `digest` is the "sha256:<hex>" digest GitHub reports for the asset, if any. The SHA256 of the download is always
+    recorded alongside it so that previously downloaded artifacts can be verified before they are reused.
+    """
+    if os.path.exists(target_path) and _has_valid_digest(target_path, quick=True):
         return False
 
-    if artifact_path_override and os.path.exists(artifact_path_override):
+    if (
+        artifact_path_override
+        and os.path.exists(artifact_path_override)
+        and _has_valid_digest(artifact_path_override, quick=True)
+    ):
         return True
 
     if not download_url.startswith("https://"):
@@ -89,8 +318,68 @@ def _download_artifact(target_path: str, download_url: str, artifact_path_overri
             target_path,
         )
     os.makedirs(os.path.dirname(target_path), exist_ok=True)
-    urlretrieve(download_url, target_path)  # noqa: S310 - checked just above
-    urlcleanup()
+
+    # Downloads go to a sibling file that is only moved into place once complete, so an interrupted download is never
+    # mistaken for the artifact. The validator of the interrupted response allows it to be resumed if unchanged.
+    part_path = f"{target_path}.part"
+    validator_path = f"{part_path}.validator"
+    headers = {"Accept": "application/octet-stream"}
+    sha256 = hashlib.sha256()
+    resume_from = 0
+    with contextlib.suppress(OSError):
+        with open(validator_path) as infile:
+            validator = infile.read()
+        resume_from = os.path.getsize(part_path)
+        if validator and resume_from:
+            headers["Range"] = f"bytes={resume_from}-"
+            headers["If-Range"] = validator
+            logger.debug("> resuming download of %s after %d bytes", part_path, resume_from)
+
+    with _SESSION.get(download_url, headers=headers, stream=True, timeout=60) as response:
+        if resume_from and response.status_code == requests.codes.requested_range_not_satisfiable:
+            # A run interrupted after the whole body was written leaves a complete .part file, for which there is
+            # nothing left to request. Any other unsatisfiable range means the partial download is unusable.
+            if response.headers.get("Content-Range") != f"bytes */{resume_from}":
+                logger.debug("> discarding %s, which cannot be resumed", part_path)
+                os.remove(part_path)
+                os.remove(validator_path)
+                return _download_artifact(target_path, download_url, digest=digest)
+            remaining_chunks = ()
+        else:
+            response.raise_for_status()
+            if response.status_code != requests.codes.partial_content:
+                resume_from = 0
+                validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+                if validator:
+                    with open(validator_path, "w") as outfile:
+                        outfile.write(validator)
+                else:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(validator_path)
+            remaining_chunks = response.iter_content(_DOWNLOAD_CHUNK_SIZE)
+
+        if resume_from:
+            with open(part_path, "rb") as infile:
+                while chunk := infile.read(_DOWNLOAD_CHUNK_SIZE):
+                    sha256.update(chunk)
+
+        # The digest is computed as the artifact streams in rather than by rereading it afterwards.
+        with open(part_path, "ab" if resume_from else "wb") as outfile:
+            for chunk in remaining_chunks:
+                outfile.write(chunk)
+                sha256.update(chunk)
+
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(validator_path)
+
+    actual_digest = sha256.hexdigest()
+    if digest and digest.startswith("sha256:") and digest[7:] != actual_digest:
+        os.remove(part_path)
+        msg = f"Download of '{download_url}' has SHA256 {actual_digest}, expected {digest[7:]}"
+        raise ValueError(msg)
+
+    os.replace(part_path, target_path)
+    _record_digest(target_path, actual_digest)
 
     return True
 
@@ -103,9 +392,13 @@ def _filter_release_info_by_tag(release_infos: list[dict[str, Any]], tag: str) -
 
 
 def _download_tester_iso(output_dir: str, tag: str = "latest") -> str | None:
+    cached = _resolve_cached(_PGRAPH_TESTS_API_URL, tag, output_dir)
+    if cached:
+        return cached
+
     logger.info("Fetching info on nxdk_pgraph_tests ISO at release tag %s...", tag)
 
-    release_info = _fetch_github_release_info("https://api.github.com/repos/abaire/nxdk_pgraph_tests", tag)
+    release_info = _fetch_github_release_info(_PGRAPH_TESTS_API_URL, tag, output_dir)
     if not release_info:
         return None
 
@@ -114,38 +407,101 @@ def _download_tester_iso(output_dir: str, tag: str = "latest") -> str | None:
         logger.error("Failed to retrieve release tag from GitHub.")
         return None
 
-    download_url = ""
-    for asset in release_info.get("assets", []):
-        if not asset.get("name", "").endswith(".iso"):
-            continue
-        download_url = asset.get("browser_download_url", "")
-        break
+    asset = next((asset for asset in release_info.get("assets", ()) if asset.get("name", "").endswith(".iso")), None)
+    download_url = asset.get("browser_download_url", "") if asset else ""
 
     if not download_url:
         logger.error("Failed to fetch download URL for latest nxdk_pgraph_tests release")
         return None
 
     target_file = os.path.join(output_dir, f"nxdk_pgraph_tests-{release_tag}.iso")
-    _download_artifact(target_file, download_url)
+    _download_artifact(target_file, download_url, digest=asset.get("digest"))
+    if os.path.isfile(target_file):
+        _record_resolved(_PGRAPH_TESTS_API_URL, tag, output_dir, target_file)
 
     return target_file
 
 
+def _extract_member(archive: zipfile.ZipFile, file_info: zipfile.ZipInfo, target_path: str) -> None:
+    """Streams a single archive member to `target_path`, whose parent directory must already exist."""
+    with archive.open(file_info) as src, open(target_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, _DOWNLOAD_CHUNK_SIZE)
+
+
+def _inflate_member(archive: mmap.mmap, file_info: zipfile.ZipInfo, target_path: str) -> None:
+    """Inflates a DEFLATE compressed archive member directly from the mapped archive with isal."""
+    # The local file header is 30 bytes, followed by the variable length filename and extra fields.
+    filename_length, extra_length = struct.unpack_from("<HH", archive, file_info.header_offset + 26)
+    data_start = file_info.header_offset + 30 + filename_length + extra_length
+    compressed = memoryview(archive)[data_start : data_start + file_info.compress_size]
+
+    decompressor = isal_zlib.decompressobj(-15)
+    crc = 0
+    try:
+        with open(target_path, "wb") as dst:
+            for offset in range(0, len(compressed), _DOWNLOAD_CHUNK_SIZE):
+                chunk = decompressor.decompress(compressed[offset : offset + _DOWNLOAD_CHUNK_SIZE])
+                crc = isal_zlib.crc32(chunk, crc)
+                dst.write(chunk)
+            chunk = decompressor.flush()
+            crc = isal_zlib.crc32(chunk, crc)
+            dst.write(chunk)
+    finally:
+        compressed.release()
+
+    if crc != file_info.CRC:
+        msg = f"Bad CRC-32 for file '{file_info.filename}'"
+        raise zipfile.BadZipFile(msg)
+
+
 def _macos_extract_app(archive_file: str, target_app_bundle: str) -> None:
     """Extracts the xemu.app bundle from the given archive and renames it."""
     app_bundle_directory = os.path.dirname(target_app_bundle)
 
     try:
         with zipfile.ZipFile(archive_file, "r") as zip_ref:
-            os.makedirs(app_bundle_directory, exist_ok=True)
-
-            for file_info in zip_ref.infolist():
-                if file_info.filename.startswith("xemu.app/") and not file_info.is_dir():
-                    zip_ref.extract(file_info, app_bundle_directory)
+            members = [
+                file_info
+                for file_info in zip_ref.infolist()
+                if file_info.filename.startswith("xemu.app/")
+                and not file_info.is_dir()
+                and ".." not in file_info.filename.split("/")
+            ]
+
+        # Members are streamed directly to their destinations, so every parent directory is created up front.
+        for directory in {os.path.dirname(file_info.filename) for file_info in members}:
+            os.makedirs(os.path.join(app_bundle_directory, directory), exist_ok=True)
+
+        # The bundle is hundreds of small files, so they are inflated concurrently. ZipFile handles may not be shared
+        # between threads, so each worker opens its own.
+        thread_state = threading.local()
+        archives: list[zipfile.ZipFile] = []
+
+        def extract(file_info: zipfile.ZipInfo) -> None:
+            archive = getattr(thread_state, "archive", None)
+            if archive is None:
+                archive = thread_state.archive = zipfile.ZipFile(archive_file, "r")
+                archives.append(archive)
+            target_path = os.path.join(app_bundle_directory, file_info.filename)
+            _extract_member(archive, file_info, target_path)
+            # zipfile does not restore permission bits, so they are applied from the Unix mode stored in the archive.
+            mode = (file_info.external_attr >> 16) & 0o777
+            if mode:
+                os.chmod(target_path, mode)
 
-            if not os.path.isfile(os.path.join(app_bundle_directory, "xemu.app", "Contents", "MacOS", "xemu")):
-                msg = f"xemu archive was downloaded at '{archive_file}' but app bundle could not be extracted"
-                raise ValueError(msg)
+        try:
+            # Much of the per-file cost is spent waiting on the filesystem and on-access malware scanning rather than
+            # inflating, so more workers than cores are used.
+            with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 4) * 4)) as executor:
+                list(executor.map(extract, members))
+        finally:
+            for archive in archives:
+                archive.close()
+
+        xemu_binary = os.path.join(app_bundle_directory, "xemu.app", "Contents", "MacOS", "xemu")
+        if not os.path.isfile(xemu_binary):
+            msg = f"xemu archive was downloaded at '{archive_file}' but app bundle could not be extracted"
+            raise ValueError(msg)
 
     except FileNotFoundError:
         logger.exception("Archive not found when extracting xemu app bundle")
@@ -162,10 +518,7 @@ def _windows_extract_app(archive_file: str, target_executable: str) -> None:
         with zipfile.ZipFile(archive_file, "r") as zip_ref:
             for file_info in zip_ref.infolist():
                 if file_info.filename == "xemu.exe":
-                    target_dir = os.path.dirname(target_executable)
-                    zip_ref.extract(file_info, target_dir)
-                    if os.path.basename(target_executable) != "xemu.exe":
-                        os.rename(os.path.join(target_dir, "xemu.exe"), target_executable)
+                    _extract_member(zip_ref, file_info, target_executable)
                     return
 
     except FileNotFoundError:
@@ -177,8 +530,12 @@ def _windows_extract_app(archive_file: str, target_executable: str) -> None:
 
 
 def _download_xemu(output_dir: str, tag: str = "latest") -> str | None:
+    cached = _resolve_cached(_XEMU_API_URL, tag, output_dir)
+    if cached:
+        return cached
+
     logger.info("Fetching info on xemu at release tag %s...", tag)
-    release_info = _fetch_github_release_info("https://api.github.com/repos/xemu-project/xemu", tag)
+    release_info = _fetch_github_release_info(_XEMU_API_URL, tag, output_dir)
     if not release_info:
         return None
 
@@ -187,74 +544,59 @@ def _download_xemu(output_dir: str, tag: str = "latest") -> str | None:
         logger.error("Failed to retrieve release tag from GitHub.")
         return None
 
-    system = platform.system()
-    if system == "Linux":
-        # xemu-v0.8.15-x86_64.AppImage
-        def check_asset(asset_name: str) -> bool:
-            if not asset_name.startswith("xemu-v") or "-dbg-" in asset_name:
-                return False
-            return asset_name.endswith(".AppImage") and platform.machine() in asset_name
-    elif system == "Darwin":
-        # xemu-macos-universal-release.zip
-        def check_asset(asset_name: str) -> bool:
-            return asset_name == "xemu-macos-universal-release.zip"
-    elif system == "Windows":
-        # xemu-win-x86_64-release.zip
-        def check_asset(asset_name: str) -> bool:
-            if not asset_name.startswith("xemu-win-") or not asset_name.endswith("release.zip"):
-                return False
-            platform_name = platform.machine()
-            if platform_name == "AMD64":
-                platform_name = "x86_64"
-            return platform_name.lower() in asset_name
-    else:
-        msg = f"System '{system} not supported"
+    if not _XEMU_ASSET_RE:
+        msg = f"System '{_SYSTEM} not supported"
         raise NotImplementedError(msg)
 
-    asset_name = ""
-    download_url = ""
-    for asset in release_info.get("assets", []):
-        asset_name = asset.get("name", "")
-        if not check_asset(asset_name):
-            continue
-        download_url = asset.get("browser_download_url", "")
-        break
+    asset = next(
+        (asset for asset in release_info.get("assets", ()) if _XEMU_ASSET_RE.fullmatch(asset.get("name", ""))), None
+    )
+    asset_name = asset.get("name", "") if asset else ""
+    download_url = asset.get("browser_download_url", "") if asset else ""
 
     if not download_url:
         logger.error("Failed to fetch download URL for latest nxdk_pgraph_tests release")
         return None
 
-    if system == "Linux":
+    if _SYSTEM == "Linux":
         target_file = os.path.join(output_dir, asset_name)
         artifact_path_override = None
-    elif system == "Darwin":
+    elif _SYSTEM == "Darwin":
         target_file = os.path.join(output_dir, f"xemu-macos-{release_tag}", "xemu.app")
         artifact_path_override = f"{target_file}.zip"
-    elif system == "Windows":
+    elif _SYSTEM == "Windows":
         target_file = os.path.join(output_dir, "xemu.exe")
         artifact_path_override = f"{target_file}.zip"
     else:
-        msg = f"System '{system} not supported"
+        msg = f"System '{_SYSTEM} not supported"
         raise NotImplementedError(msg)
 
     logger.debug("Xemu %s %s", target_file, download_url)
-    was_downloaded = _download_artifact(target_file, download_url, artifact_path_override)
+    was_downloaded = _download_artifact(target_file, download_url, artifact_path_override, asset.get("digest"))
 
+    # Archives only need to be extracted if the extracted artifact is missing and the archive is actually present.
     if was_downloaded:
-        if system == "Linux":
+        if _SYSTEM == "Linux":
             os.chmod(target_file, 0o700)
-        elif system == "Darwin":
+        elif _SYSTEM == "Darwin" and os.path.isfile(artifact_path_override):
             _macos_extract_app(artifact_path_override, target_file)
-        elif system == "Windows":
+        elif _SYSTEM == "Windows" and os.path.isfile(artifact_path_override):
             _windows_extract_app(artifact_path_override, target_file)
 
+    if os.path.exists(target_file):
+        _record_resolved(_XEMU_API_URL, tag, output_dir, target_file)
+
     return target_file
 
 
 def _download_xemu_hdd(output_dir: str, tag: str = "latest") -> str | None:
+    cached = _resolve_cached(_XEMU_HDD_API_URL, tag, output_dir)
+    if cached:
+        return cached
+
     logger.info("Fetching info on xemu_hdd at release tag %s...", tag)
 
-    release_info = _fetch_github_release_info("https://api.github.com/repos/xemu-project/xemu-hdd-image", tag)
+    release_info = _fetch_github_release_info(_XEMU_HDD_API_URL, tag, output_dir)
     if not release_info:
         return None
 
@@ -263,27 +605,35 @@ def _download_xemu_hdd(output_dir: str, tag: str = "latest") -> str | None:
         logger.error("Failed to retrieve release tag from GitHub.")
         return None
 
-    download_url = ""
-    for asset in release_info.get("assets", []):
-        if not asset.get("name", "").endswith(".zip"):
-            continue
-        download_url = asset.get("browser_download_url", "")
-        break
+    asset = next((asset for asset in release_info.get("assets", ()) if asset.get("name", "").endswith(".zip")), None)
+    download_url = asset.get("browser_download_url", "") if asset else ""
 
     if not download_url:
         logger.error("Failed to fetch download URL for latest nxdk_pgraph_tests release")
         return None
 
     target_file = os.path.join(output_dir, f"xemu_hdd-{release_tag}.qcow2")
+    if os.path.isfile(target_file):
+        _record_resolved(_XEMU_HDD_API_URL, tag, output_dir, target_file)
+        return target_file
+
     archive_file = f"{target_file}.zip"
-    if _download_artifact(target_file, download_url, archive_file):
+    was_downloaded = _download_artifact(target_file, download_url, archive_file, asset.get("digest"))
+    if was_downloaded and os.path.isfile(archive_file):
         try:
-            with zipfile.ZipFile(archive_file, "r") as zip_ref:
+            with open(archive_file, "rb") as infile, zipfile.ZipFile(infile, "r") as zip_ref:
                 for file_info in zip_ref.infolist():
                     if file_info.filename == "xbox_hdd.qcow2":
-                        zip_ref.extract(file_info, output_dir)
-                        hdd_image = os.path.join(output_dir, "xbox_hdd.qcow2")
-                        os.rename(hdd_image, target_file)
+                        # The image is only moved into place once complete, as its presence short-circuits this step.
+                        hdd_image = f"{target_file}.tmp"
+                        if isal_zlib and file_info.compress_type == zipfile.ZIP_DEFLATED:
+                            # The archive is mapped rather than read so the compressed image is never copied into
+                            # Python buffers.
+                            with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as archive:
+                                _inflate_member(archive, file_info, hdd_image)
+                        else:
+                            _extract_member(zip_ref, file_info, hdd_image)
+                        os.replace(hdd_image, target_file)
                         break
 
         except FileNotFoundError:
@@ -293,6 +643,9 @@ def _download_xemu_hdd(output_dir: str, tag: str = "latest") -> str | None:
             logger.exception("Invalid zip archive when extracting xemu_hdd app bundle")
             raise
 
+    if os.path.isfile(target_file):
+        _record_resolved(_XEMU_HDD_API_URL, tag, output_dir, target_file)
+
     return target_file
 
 
@@ -331,14 +684,14 @@ def _generate_xemu_toml(
 
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     with open(file_path, "w") as outfile:
-        outfile.write("\n".join(content))
+        outfile.writelines(f"{line}\n" for line in content)
 
 
 def _build_macos_xemu_binary_paths(xemu_app_bundle_path: str) -> tuple[str, str]:
     contents_path = os.path.join(xemu_app_bundle_path, "Contents")
     library_path = ":".join(
         [
-            os.path.join(contents_path, "Libraries", platform.uname().machine),
+            os.path.join(contents_path, "Libraries", _MACHINE),
             os.environ.get("DYLD_FALLBACK_LIBRARY_PATH", ""),
         ]
     )
@@ -352,42 +705,135 @@ def _build_macos_xemu_binary_paths(xemu_app_bundle_path: str) -> tuple[str, str]
 def _build_emulator_command(xemu_path: str, *, no_bundle: bool = False) -> tuple[str, str]:
     portable_mode_config_path = os.path.dirname(xemu_path)
 
-    system = platform.system()
-    if system == "Darwin":
+    if _SYSTEM == "Darwin":
         if not no_bundle:
             xemu_path, portable_mode_config_path = _build_macos_xemu_binary_paths(xemu_path)
-    elif system == "Linux":
+    elif _SYSTEM == "Linux":
         if xemu_path.endswith("AppImage"):
             # AppImages need to have the xemu.toml file within their home dir.
             portable_mode_config_path = os.path.join(f"{xemu_path}.home", ".local", "share", "xemu", "xemu")
-    elif system == "Windows":
+    elif _SYSTEM == "Windows":
         pass
     else:
-        msg = f"Platform {system} not supported."
+        msg = f"Platform {_SYSTEM} not supported."
         raise NotImplementedError(msg)
 
     return xemu_path + " -dvd_path {ISO}", os.path.join(portable_mode_config_path, "xemu.toml")
 
 
-def _determine_output_directory(results_path: str, emulator_command: str, *, is_vulkan: bool) -> str | None:
-    command = Config(emulator_command=emulator_command).build_emulator_command("__this_file_does_not_exist")
+def _wait_for_process_group_exit(pgid: int, timeout: float = 0.5, poll_interval: float = 0.01) -> None:
+    """Waits up to `timeout` seconds for every process in the given process group to exit."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            os.killpg(pgid, 0)
+        except ProcessLookupError:
+            return
+        except PermissionError:
+            pass
+        sleep(poll_interval)
+
+
+def _run_emulator(command: list[str], timeout: float) -> tuple[int | None, str, str]:
+    """Runs the emulator for up to `timeout` seconds, returning (returncode, stdout, stderr).
+
+    The returncode is None if the emulator had to be killed.
+    """
+    # xemu is started in its own session so that it and any helpers it spawns can be killed and waited on as a group.
+    use_process_group = hasattr(os, "killpg")
+    with subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=use_process_group,
+    ) as process:
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            if use_process_group:
+                with contextlib.suppress(ProcessLookupError):
+                    os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+            stdout, stderr = process.communicate()
+
+            # Give the GL subsystem time to settle after the hard kill. Prevents deadlock in get_output_directory.
+            if use_process_group:
+                _wait_for_process_group_exit(process.pid)
+            else:
+                sleep(0.5)
+            return None, stdout, stderr
+
+    return process.returncode, stdout, stderr
+
+
+def _probe_emulator_version(binary: str) -> str | None:
+    """Attempts to retrieve the emulator version via `--version`, which avoids initializing the GL subsystem."""
     try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True, timeout=1)
-        stderr = result.stderr
-    except subprocess.TimeoutExpired as err:
-        # Windows Python 3.13 returns a string rather than bytes.
-        stderr = err.stderr.decode() if isinstance(err.stderr, bytes) else err.stderr
-
-        # Give tne GL subsystem time to settle after the hard kill. Prevents deadlock in get_output_directory.
-        sleep(0.5)
-    except subprocess.CalledProcessError as err:
-        stderr = err.stderr.decode() if isinstance(err.stderr, bytes) else err.stderr
-        logger.error(stderr)  # noqa: TRY400 Use `logging.exception` instead of `logging.error`
+        returncode, stdout, stderr = _run_emulator([binary, "--version"], timeout=2)
+    except OSError:
+        return None
+    if returncode != 0:
+        return None
+
+    emulator_output = EmulatorOutput.parse(stdout=[], stderr=stderr.splitlines() + stdout.splitlines())
+    # If no version components were found, only the bare emulator name is returned.
+    if emulator_output.emulator_version in {"", "xemu"}:
+        return None
+    return emulator_output.emulator_version
+
+
+def _launch_emulator_for_version(command: list[str]) -> str:
+    """Retrieves the emulator version by briefly launching the emulator with a nonexistent ISO."""
+    returncode, _, stderr = _run_emulator(command, timeout=1)
+    if returncode:
+        logger.error(stderr)
+        err = subprocess.CalledProcessError(returncode, command, stderr=stderr)
         logger.exception(err)  # noqa: TRY401 Redundant exception object included in `logging.exception` call
-        raise
+        raise err
 
-    emulator_output = EmulatorOutput.parse(stdout=[], stderr=stderr.split("\n"))
-    output_directory = get_output_directory(emulator_output.emulator_version, HostProfile(), is_vulkan=is_vulkan)
+    # EmulatorOutput.parse pops leading lines off of stderr, so it must be given a list rather than a lazy iterable.
+    return EmulatorOutput.parse(stdout=[], stderr=stderr.splitlines()).emulator_version
+
+
+def _determine_output_directory(
+    results_path: str, emulator_command: str, *, is_vulkan: bool, cache_file: str | None = None
+) -> str | None:
+    """Returns the results directory for the given emulator command.
+
+    If `cache_file` is given, the emulator version, and whether the emulator supports `--version`, are cached there,
+    keyed by the emulator binary, so that neither needs to be probed again until the binary changes.
+    """
+    command = Config(emulator_command=emulator_command).build_emulator_command("__this_file_does_not_exist")
+    binary = command[0]
+
+    cache_key = None
+    entry: dict[str, Any] = {}
+    if cache_file:
+        with contextlib.suppress(OSError):
+            binary_stat = os.stat(binary)
+            cache_key = f"{os.path.realpath(binary)}@{binary_stat.st_mtime_ns}:{binary_stat.st_size}"
+            entry = _load_cache_file(cache_file).get(cache_key)
+            if not isinstance(entry, dict):
+                entry = {}
+
+    emulator_version = entry.get("version")
+    if not emulator_version:
+        # Builds without `--version` support launch fully and time out instead, so that is only ever discovered once.
+        supports_version_flag = entry.get("supports_version_flag", True)
+        if supports_version_flag:
+            emulator_version = _probe_emulator_version(binary)
+            supports_version_flag = bool(emulator_version)
+        if not emulator_version:
+            emulator_version = _launch_emulator_for_version(command)
+
+        if cache_key:
+            _update_cache_file(
+                cache_file, cache_key, {"version": emulator_version, "supports_version_flag": supports_version_flag}
+            )
+
+    output_directory = get_output_directory(emulator_version, HostProfile(), is_vulkan=is_vulkan)
 
     return os.path.join(
         results_path,
@@ -406,6 +852,7 @@ def run(
     overwrite_existing_outputs: bool,
     no_bundle: bool = False,
     use_vulkan: bool = False,
+    cache_path: str | None = None,
 ):
     emulator_command, portable_mode_config_path = _build_emulator_command(xemu_path, no_bundle=no_bundle)
     if not emulator_command:
@@ -421,7 +868,10 @@ def run(
     )
 
     output_directory = _determine_output_directory(
-        results_path, emulator_command=emulator_command, is_vulkan=use_vulkan
+        results_path,
+        emulator_command=emulator_command,
+        is_vulkan=use_vulkan,
+        cache_file=os.path.join(cache_path, _EMULATOR_VERSIONS_FILENAME) if cache_path else None,
     )
     if not overwrite_existing_outputs and os.path.isdir(output_directory):
         logger.error("Output directory %s already exists, exiting", output_directory)
@@ -447,6 +897,21 @@ def run(
     return ret
 
 
+def _link_or_copy(source: str, destination: str) -> None:
+    """Hard links `source` to `destination`, falling back to a copy if they are on different filesystems."""
+    if os.path.lexists(destination):
+        with contextlib.suppress(OSError):
+            if os.path.samefile(source, destination):
+                return
+        # The destination may itself be a hard link, so it is replaced rather than overwritten in place.
+        os.remove(destination)
+
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
 def _ensure_path(path: str) -> str:
     path = os.path.abspath(os.path.expanduser(path))
     os.makedirs(path, exist_ok=True)
@@ -529,15 +994,18 @@ def _process_arguments_and_run():
     cache_path = _ensure_cache_path(args.cache_path)
     results_path = _ensure_results_path(args.results_path)
 
-    if args.iso:
-        iso = os.path.abspath(os.path.expanduser(args.iso))
-    else:
-        iso = _download_tester_iso(cache_path, args.pgraph_tag)
+    # The artifacts are independent of each other, so any that need to be downloaded are fetched concurrently.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        iso_future = None if args.iso else executor.submit(_download_tester_iso, cache_path, args.pgraph_tag)
+        xemu_future = None if args.xemu else executor.submit(_download_xemu, cache_path, args.xemu_tag)
+        hdd_future = None if args.hdd else executor.submit(_download_xemu_hdd, cache_path)
+
+    iso = os.path.abspath(os.path.expanduser(args.iso)) if args.iso else iso_future.result()
     if not iso or not os.path.isfile(iso):
         logger.error("Invalid ISO path '%s'", iso)
         return 1
 
-    xemu = os.path.abspath(os.path.expanduser(args.xemu)) if args.xemu else _download_xemu(cache_path, args.xemu_tag)
+    xemu = os.path.abspath(os.path.expanduser(args.xemu)) if args.xemu else xemu_future.result()
     if not xemu:
         logger.error("Failed to download xemu")
         return 1
@@ -545,7 +1013,7 @@ def _process_arguments_and_run():
         logger.error("Invalid xemu path '%s'", xemu)
         return 1
 
-    hdd = os.path.abspath(os.path.expanduser(args.hdd)) if args.hdd else _download_xemu_hdd(cache_path)
+    hdd = os.path.abspath(os.path.expanduser(args.hdd)) if args.hdd else hdd_future.result()
     if not hdd:
         logger.error("Failed to download xemu_hdd")
         return 1
@@ -556,10 +1024,8 @@ def _process_arguments_and_run():
     def _copy_inputs_and_run(temp_path: str, *, overwrite_existing_outputs: bool) -> int:
         inputs_path = os.path.join(temp_path, "inputs")
         os.makedirs(inputs_path, exist_ok=True)
-        with contextlib.suppress(SameFileError):
-            shutil.copy(args.mcpx, os.path.join(inputs_path, "mcpx.bin"))
-        with contextlib.suppress(SameFileError):
-            shutil.copy(args.bios, os.path.join(inputs_path, "bios.bin"))
+        _link_or_copy(args.mcpx, os.path.join(inputs_path, "mcpx.bin"))
+        _link_or_copy(args.bios, os.path.join(inputs_path, "bios.bin"))
         return run(
             iso_path=iso,
             work_path=temp_path,
@@ -570,6 +1036,7 @@ def _process_arguments_and_run():
             overwrite_existing_outputs=overwrite_existing_outputs,
             no_bundle=args.no_bundle,
             use_vulkan=args.use_vulkan,
+            cache_path=cache_path,
         )
 
     if args.temp_path: